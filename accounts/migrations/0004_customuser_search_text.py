@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+from accounts.search import build_search_text
+
+TRIGRAM_INDEX = 'accounts_customuser_search_trgm'
+
+
+def fill_search_text(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    users = []
+    for user in CustomUser.objects.only('id', 'first_name', 'last_name', 'username', 'employee_id').iterator(chunk_size=2000):
+        user.search_text = build_search_text(user)
+        users.append(user)
+        if len(users) >= 2000:
+            CustomUser.objects.bulk_update(users, ['search_text'])
+            users = []
+    CustomUser.objects.bulk_update(users, ['search_text'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # PostgreSQL بس: LIKE '%...%' على search_text بيستخدم الـ index ده؛ باقي القواعد عليها btree (db_index)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON accounts_customuser USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_customuser_base_salary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='search_text',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=512),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_customuser_search_text'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from .search import SEARCH_SOURCE_FIELDS, build_search_text
+
 class CustomUser(AbstractUser):
     ROLE_CHOICES = (
         ('admin', 'Admin'),
@@ -13,7 +15,18 @@ class CustomUser(AbstractUser):
     bank_account_number = models.CharField(max_length=64, blank=True, null=True)
     base_salary = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
     is_defult_password = models.BooleanField(default=True)
+    # الاسم + اسم المستخدم + الرقم التعريفي بعد التوحيد (accounts.search)؛ بيتحدث مع save.
+    # البحث __contains: على PostgreSQL بيستخدم index الـ trigram (migration 0004)، btree مالوش لازمة
+    search_text = models.CharField(max_length=512, blank=True, default='', editable=False)
     USERNAME_FIELD = 'employee_id'
     REQUIRED_FIELDS = ['username', 'role']
+
+    def save(self, *args, **kwargs):
+        self.search_text = build_search_text(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(SEARCH_SOURCE_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.username} - {self.role}"
@@ -0,0 +1,40 @@
+"""
+بحث الموظفين بالعربي: نص موحّد (من غير تشكيل، والألف/الهمزة/التاء المربوطة/الياء بشكل واحد)
+متخزن في CustomUser.search_text، وعليه index trigram على PostgreSQL.
+"""
+import re
+
+from django.db.models import Q
+
+_TASHKEEL_RE = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')  # + التطويل
+_INVISIBLE_RE = re.compile('[\u200b-\u200f\u202a-\u202e\u2066-\u2069\ufeff]')
+_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+    '\u00a0': ' ',
+})
+
+SEARCH_SOURCE_FIELDS = ('first_name', 'last_name', 'username', 'employee_id')
+
+
+def normalize_arabic(text):
+    """نص موحّد للبحث: "أحمد  إبراهيم" و"احمد ابراهيم" بيطلعوا نفس الشكل."""
+    text = _INVISIBLE_RE.sub('', _TASHKEEL_RE.sub('', str(text or '')))
+    return ' '.join(text.translate(_LETTERS).lower().split())
+
+
+def build_search_text(user):
+    return normalize_arabic(' '.join(str(getattr(user, f) or '') for f in SEARCH_SOURCE_FIELDS))
+
+
+def search_filter(term, prefix=''):
+    """
+    Q للبحث في search_text: كل كلمة في البحث لازم تكون موجودة (بأي ترتيب).
+    prefix مثلًا 'user__' للبحث من جدول مرتبط بالموظف.
+    """
+    q = Q()
+    for word in normalize_arabic(term).split():
+        q &= Q(**{f'{prefix}search_text__contains': word})
+    return q
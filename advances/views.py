@@ -12,6 +12,7 @@ from django.http import (
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
 
+from accounts.search import search_filter
 from .models import AdvancePeriod, AdvanceRequest, AdvanceType, AdvanceStatus
 from .forms import AdvanceRequestForm
 
@@ -337,11 +338,8 @@ def requests_list(request):
         qs = qs.filter(status=AdvanceStatus.UNDER_REVIEW)
 
     if q:
-        qs = qs.filter(
-            Q(user__username__icontains=q) |
-            Q(user__first_name__icontains=q) |
-            Q(user__last_name__icontains=q)
-        )
+        # بحث موحّد عربي على search_text (trigram index على PostgreSQL)
+        qs = qs.filter(search_filter(q, prefix='user__'))
 
     if q_cycle in ('complete', 'incomplete'):
         active_periods = AdvancePeriod.objects.filter(is_active=True)
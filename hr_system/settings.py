@@ -119,6 +119,10 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# كشوف المرتبات PDF: خط TTF فيه حروف عربي (من غيره reportlab مش هيرسم العربي)، ومكان الكاش
+SLIP_PDF_FONT = config('SLIP_PDF_FONT', default='/usr/share/fonts/truetype/noto/NotoNaskhArabic-Regular.ttf')
+SLIP_PDF_CACHE_DIR = os.path.join(MEDIA_ROOT, 'slip_pdfs')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # -------------------
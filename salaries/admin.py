@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import SalaryStatement
+from .summaries import refresh_branch_summary
 
 @admin.register(SalaryStatement)
 class SalaryStatementAdmin(admin.ModelAdmin):
@@ -51,6 +52,44 @@ class SalaryStatementAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         obj._current_user = request.user
         super().save_model(request, obj, form, change)
+        # إجماليات الفروع للشهر (والشهر القديم لو اتغير)
+        for month in {obj.month, form.initial.get('month')} - {None}:
+            refresh_branch_summary(month)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_branch_summary(obj.month)
+
+    def delete_queryset(self, request, queryset):
+        months = set(queryset.values_list('month', flat=True))
+        super().delete_queryset(request, queryset)
+        for month in months:
+            refresh_branch_summary(month)
 
     def has_delete_permission(self, request, obj=None):
         return True
+
+
+from .models import SalaryImportJob
+
+@admin.register(SalaryImportJob)
+class SalaryImportJobAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'kind', 'file_format', 'status', 'attempts', 'uploader', 'locked_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('id', 'locked_by', 'locked_at', 'created_at', 'finished_at')
+
+
+from .models import BranchPayrollSummary
+
+@admin.register(BranchPayrollSummary)
+class BranchPayrollSummaryAdmin(admin.ModelAdmin):
+    """للعرض بس: الجدول بيتحسب من المفردات (salaries.summaries)."""
+    list_display = ('month', 'branch_name', 'employees', 'total_entitlements', 'total_deductions', 'net_salary', 'updated_at')
+    list_filter = ('month',)
+    search_fields = ('branch_name',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,47 @@
+"""
+كتابة كميات كبيرة من الصفوف: COPY FROM STDIN على PostgreSQL (psycopg 3)،
+و bulk_create على دفعات في أي قاعدة تانية (SQLite في الاختبارات مثلًا).
+"""
+from django.db import connections, router
+
+
+def copy_supported(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+def _insert_fields(model):
+    return [f for f in model._meta.concrete_fields if not f.primary_key]
+
+
+def copy_insert(model, objs, connection):
+    """COPY للصفوف (من غير ما يرجّع ids)، ويرجّع عددها."""
+    fields = _insert_fields(model)
+    qn = connection.ops.quote_name
+    sql = 'COPY {} ({}) FROM STDIN'.format(
+        qn(model._meta.db_table), ', '.join(qn(f.column) for f in fields),
+    )
+    count = 0
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(sql) as copy:
+            for obj in objs:
+                copy.write_row([
+                    f.get_db_prep_save(f.pre_save(obj, True), connection) for f in fields
+                ])
+                count += 1
+    return count
+
+
+def bulk_insert(model, objs, batch_size=1000, use_copy=None):
+    """
+    يضيف objs في جدول model بأسرع طريقة متاحة ويرجّع عددها.
+    use_copy=None: COPY لو القاعدة PostgreSQL + psycopg 3، وإلا bulk_create.
+    """
+    connection = connections[router.db_for_write(model)]
+    if use_copy is None:
+        use_copy = copy_supported(connection)
+    if use_copy:
+        return copy_insert(model, objs, connection)
+    return len(model.objects.bulk_create(objs, batch_size=batch_size))
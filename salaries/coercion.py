@@ -0,0 +1,274 @@
+"""
+أعمدة شيت المرتبات + تحويلها على مستوى العمود كله (pandas/NumPy) بدل خلية خلية:
+تنظيف الحروف الخفية (RTL)، تحويل الأرقام العربية، وقراءة المبالغ، مع ماسك أخطاء لكل صف.
+"""
+import re
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# -- أعمدة الشيت --
+EMPLOYEE_ID_COLUMN = 'رقم تعريفى'
+NAME_COLUMN = 'الاسم'
+NOTES_COLUMN = 'ملاحظات'
+BRANCH_COLUMNS = ('اسم الفرع', 'الفرع')
+BANK_COLUMNS = ('رقم الحساب البنكي', 'رقم الحساب')
+MONTH_COLUMNS = ('الشهر', 'شهر المرتب', 'month')
+BASE_SALARY_COLUMNS = (
+    'المرتب الاساسي', 'الراتب الأساسي', 'الراتب الاساسي', 'الراتب الاساسى',
+    'basic_salary', 'base_salary', 'base salary',
+)
+
+# حقل SalaryStatement -> اسم العمود في الشيت (كلها إجبارية)
+STATEMENT_COLUMNS = {
+    'base_salary': 'المرتب الاساسي',
+    'changed_salary': 'المرتب المتغير',
+    'special_bonus': 'علاوة استثنائية',
+    'extra': 'الاضافى',
+    'rest_allowance': 'بدل الراحة',
+    'performance_evaluation': 'تقييم أداء',
+    'special_incentive': 'حافز استثنائى',
+    'meal_allowance': 'بدل وجبة',
+    'transport_allowance': 'بدل انتقال',
+    'total_entitlements': 'اجمالي الاستحقاقات',
+    'loan': 'السلف',
+    'insurance': 'تأمينات',
+    'absence': 'الغياب',
+    'penalties': 'الجزاءات',
+    'quality_deduction_cash': 'خصم الجودة نقدى',
+    'quality_deduction_days': 'خصم الجودة أيام',
+    'installments': 'الأقساط',
+    'monthly_receipts': 'الايصالات الشهرية',
+    'total_deductions': 'اجمالي الاستقطاعات',
+    'net_salary': 'صافي المرتبات',
+}
+TEXT_FIELDS = ('performance_evaluation',)
+DECIMAL_FIELDS = tuple(f for f in STATEMENT_COLUMNS if f not in TEXT_FIELDS)
+
+REQUIRED_COLUMNS = (EMPLOYEE_ID_COLUMN, NAME_COLUMN) + tuple(STATEMENT_COLUMNS.values())
+
+# ترتيب موحّد لكل الأعمدة المعروفة؛ بيُستخدم لدمج شيتات بترتيب أعمدة مختلف.
+# كل أسماء عمود الشهر بتتجمع في خانة واحدة (MONTH_COLUMNS[0]) عشان resolve_month_column تلاقيها
+CANONICAL_COLUMNS = tuple(dict.fromkeys(
+    REQUIRED_COLUMNS + (NOTES_COLUMN,) + BRANCH_COLUMNS + BANK_COLUMNS + BASE_SALARY_COLUMNS + MONTH_COLUMNS[:1]
+))
+CANONICAL_INDEX = {name: i for i, name in enumerate(CANONICAL_COLUMNS)}
+
+MAX_AMOUNT = 10 ** 8  # DecimalField(max_digits=10, decimal_places=2)
+# أطوال أعمدة القاعدة (CustomUser / SalaryStatement)؛ الموديول ده بيشتغل من غير django.setup()
+MAX_EMPLOYEE_ID = 20
+MAX_NAME_PART = 150      # first_name / last_name
+MAX_BRANCH = 255
+MAX_BANK = 64
+MAX_TEXT_FIELD = 255     # performance_evaluation
+
+# علامات الاتجاه والمسافات الخفية اللي بتيجي من إكسل العربي
+_INVISIBLE_RE = '[\u200b-\u200f\u202a-\u202e\u2066-\u2069\ufeff]'
+# 2024-05 / 2024/5 / 2024-05-01 00:00:00 أو 05/2024
+_MONTH_RE = re.compile(r'^\s*(?:(\d{4})[-/.](\d{1,2})(?:[-/.]\d{1,2})?|(\d{1,2})[-/.](\d{4}))(?:[ T].*)?$')
+_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹٫٬', '01234567890123456789.,')
+
+
+class ImportValidationError(Exception):
+    """صفوف فيها قيم غير صحيحة؛ errors = [(رقم الصف, رقم الموظف, العمود, السبب)]."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        shown = '، '.join(f'الصف {row} ({column}): {reason}' for row, _, column, reason in errors[:5])
+        more = f' و{len(errors) - 5} خطأ آخر' if len(errors) > 5 else ''
+        super().__init__(f'بيانات غير صحيحة في الملف: {shown}{more}')
+
+
+def resolve_columns(header):
+    """يرجّع {اسم العمود: رقمه} ويرمي KeyError لو عمود إجباري ناقص."""
+    index = {}
+    for i, name in enumerate(header):
+        if name is None:
+            continue
+        index.setdefault(str(name).strip(), i)
+    for name in REQUIRED_COLUMNS:
+        if name not in index:
+            raise KeyError(name)
+    return index
+
+
+def resolve_month_column(index):
+    """رقم عمود الشهر في الشيت (وضع backfill)، أو KeyError لو مش موجود."""
+    for name in MONTH_COLUMNS:
+        if name in index:
+            return index[name]
+    raise KeyError(MONTH_COLUMNS[0])
+
+
+def parse_month(value):
+    """نص الشهر من الشيت -> أول يوم في الشهر، أو None لو مش مفهوم."""
+    text = re.sub(_INVISIBLE_RE, '', str(value)).translate(_DIGITS)
+    match = _MONTH_RE.match(text)
+    if not match:
+        return None
+    year, month = (match.group(1), match.group(2)) if match.group(1) else (match.group(4), match.group(3))
+    try:
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+def to_canonical(row, index, branch=''):
+    """يرتّب الصف حسب CANONICAL_COLUMNS؛ branch بيتحط لو الشيت مالوش عمود فرع."""
+    values = [row[index[name]] if name in index else '' for name in CANONICAL_COLUMNS]
+    month = next((index[name] for name in MONTH_COLUMNS if name in index), None)
+    if month is not None:
+        values[CANONICAL_INDEX[MONTH_COLUMNS[0]]] = row[month]
+    if branch and not any(values[CANONICAL_INDEX[name]] for name in BRANCH_COLUMNS):
+        values[CANONICAL_INDEX[BRANCH_COLUMNS[0]]] = branch
+    return tuple(values)
+
+
+def clean_text(series):
+    """يشيل علامات الاتجاه الخفية و NBSP من عمود نصوص كامل."""
+    return (
+        series.astype(str)
+        .str.replace(_INVISIBLE_RE, '', regex=True)
+        .str.replace('\u00A0', ' ', regex=False)
+        .str.strip()
+    )
+
+
+def clean_employee_id(value):
+    """رقم موظف واحد بنفس تنظيف coerce_rows (للصفوف اللي بتترفض قبل التحويل)."""
+    return re.sub(_INVISIBLE_RE, '', str(value)).replace('\u00A0', ' ').strip().translate(_DIGITS)
+
+
+def clean_number(series):
+    """نص رقمي موحّد: أرقام لاتينية ومن غير مسافات أو فواصل آلاف."""
+    return clean_text(series).str.translate(_DIGITS).str.replace(r'[\s,]', '', regex=True)
+
+
+def _first_non_empty(frame, index, names, cleaner):
+    result = None
+    for name in names:
+        i = index.get(name)
+        if i is None:
+            continue
+        values = cleaner(frame[i])
+        result = values if result is None else result.where(result != '', values)
+    if result is None:
+        return pd.Series([''] * len(frame), index=frame.index, dtype=object)
+    return result
+
+
+class CoercedBatch:
+    """
+    ناتج تحويل دفعة صفوف:
+    amounts[field] مصفوفة float64 لكل عمود مبالغ (مقرّبة لقرشين)، text[field] النص المنظّف،
+    invalid ماسك bool للصفوف المرفوضة، errors [(رقم الصف في الدفعة, العمود, السبب)].
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.amounts = {}
+        self.text = {}
+        self.invalid = np.zeros(size, dtype=bool)
+        self.errors = []
+
+    def reject(self, positions, column, reasons):
+        for pos, reason in zip(positions, reasons):
+            self.invalid[pos] = True
+            self.errors.append((int(pos), column, reason))
+
+    def records(self):
+        """صف واحد كقاموس (للصفوف السليمة فقط) بالشكل اللي محرك الاستيراد بيستخدمه."""
+        fields = list(STATEMENT_COLUMNS) + ['notes']
+        # المبالغ Decimal من القيم المقرّبة (نفس القيمة اللي اتعمل عليها فحص الحد)
+        columns = [self.amounts.get(f, self.text.get(f)) for f in fields]
+        amounts = [f in self.amounts for f in fields]
+        base_salary = self.amounts['user_base_salary']
+        for pos in np.flatnonzero(~self.invalid):
+            base = base_salary[pos]
+            yield {
+                'position': int(pos),
+                'employee_id': self.text['employee_id'][pos],
+                'name': self.text['name'][pos],
+                'branch': self.text['branch'][pos],
+                'bank': self.text['bank'][pos],
+                'base_salary': None if np.isnan(base) else _to_decimal(base),
+                'fields': {
+                    f: _to_decimal(col[pos]) if amount else col[pos]
+                    for f, col, amount in zip(fields, columns, amounts)
+                },
+            }
+
+
+def _to_decimal(value):
+    return Decimal(f'{value:.2f}')
+
+
+def _reject_long(batch, values, limit, column):
+    """الخلية الأطول من عمود القاعدة بترفض الصف هنا بدل DataError يوقّع المهمة كلها."""
+    too_long = np.flatnonzero((values.str.len() > limit).to_numpy())
+    batch.reject(too_long, column, [f'أطول من {limit} حرف'] * len(too_long))
+
+
+def _round_amounts(values):
+    """تقريب لقرشين قبل فحص الحد (99999999.999 بتبقى 1e8 وتعدّي numeric(10,2))؛ + 0.0 بتشيل -0.0."""
+    return np.round(values, 2) + 0.0
+
+
+def coerce_rows(index, rows):
+    """يحوّل دفعة صفوف (tuples نصوص) عمود عمود ويرجّع CoercedBatch."""
+    frame = pd.DataFrame.from_records(rows) if rows else pd.DataFrame()
+    batch = CoercedBatch(len(frame))
+    if not batch.size:
+        return batch
+
+    employee_ids = clean_text(frame[index[EMPLOYEE_ID_COLUMN]]).str.translate(_DIGITS)
+    missing = np.flatnonzero((employee_ids == '').to_numpy())
+    batch.reject(missing, EMPLOYEE_ID_COLUMN, ['رقم الموظف فاضي'] * len(missing))
+    _reject_long(batch, employee_ids, MAX_EMPLOYEE_ID, EMPLOYEE_ID_COLUMN)
+    batch.text['employee_id'] = employee_ids.to_numpy()
+    names = clean_text(frame[index[NAME_COLUMN]])
+    # الاسم بيتقسم first_name (أول كلمة) و last_name (الباقي) زي _sync_users
+    words = names.str.split()
+    _reject_long(batch, words.str[0].fillna(''), MAX_NAME_PART, NAME_COLUMN)
+    _reject_long(batch, words.str[1:].str.join(' '), MAX_NAME_PART, NAME_COLUMN)
+    batch.text['name'] = names.to_numpy()
+
+    for field, column in STATEMENT_COLUMNS.items():
+        raw = frame[index[column]]
+        if field in TEXT_FIELDS:
+            cleaned = clean_text(raw)
+            _reject_long(batch, cleaned, MAX_TEXT_FIELD, column)
+            batch.text[field] = cleaned.to_numpy()
+            continue
+        cleaned = clean_number(raw)
+        values = _round_amounts(pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype='float64'))
+        bad = np.flatnonzero(np.isnan(values) | (np.abs(values) >= MAX_AMOUNT))
+        if len(bad):
+            empty = (cleaned == '').to_numpy()
+            batch.reject(bad, column, [
+                'خانة فاضية' if empty[pos] else f'قيمة غير صحيحة: {raw.iat[pos]}' for pos in bad
+            ])
+        batch.amounts[field] = values
+        batch.text[field] = cleaned.to_numpy()
+
+    notes_i = index.get(NOTES_COLUMN)
+    batch.text['notes'] = (
+        frame[notes_i].astype(str).to_numpy() if notes_i is not None else np.full(batch.size, '', dtype=object)
+    )
+
+    # الحقول الثابتة على المستخدم: أول قيمة مش فاضية من الأسماء البديلة
+    branch = _first_non_empty(frame, index, BRANCH_COLUMNS, clean_text)
+    bank = _first_non_empty(frame, index, BANK_COLUMNS, clean_number)
+    _reject_long(batch, branch, MAX_BRANCH, BRANCH_COLUMNS[0])
+    _reject_long(batch, bank, MAX_BANK, BANK_COLUMNS[0])
+    batch.text['branch'] = branch.to_numpy()
+    batch.text['bank'] = bank.to_numpy()
+    base = _first_non_empty(frame, index, BASE_SALARY_COLUMNS, clean_number)
+    base_values = _round_amounts(pd.to_numeric(base, errors='coerce').to_numpy(dtype='float64'))
+    # الراتب الأساسي على المستخدم بيتجاهل القيم السالبة أو الغلط (زي to_decimal القديمة)
+    batch.amounts['user_base_salary'] = np.where(
+        (base_values < 0) | (np.abs(base_values) >= MAX_AMOUNT), np.nan, base_values,
+    )
+    return batch
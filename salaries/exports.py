@@ -0,0 +1,97 @@
+"""
+ملفات إكسل بتطلع من النظام، مكتوبة بـ openpyxl في وضع write_only
+(صف ورا صف على الملف من غير ما الشيت كله يتبني في الذاكرة).
+"""
+import zipfile
+
+from openpyxl import Workbook
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.writer.excel import ExcelWriter
+
+from .coercion import (
+    BANK_COLUMNS, BRANCH_COLUMNS, EMPLOYEE_ID_COLUMN, MONTH_COLUMNS, NAME_COLUMN, NOTES_COLUMN, STATEMENT_COLUMNS,
+)
+
+ERROR_REPORT_HEADER = ('رقم الصف', 'رقم تعريفى', 'العمود', 'السبب')
+
+# نفس أعمدة شيت الرفع (الملف يترفع تاني زي ما هو) + عمود الشهر
+PAYROLL_HEADER = (
+    (EMPLOYEE_ID_COLUMN, NAME_COLUMN, BRANCH_COLUMNS[0], BANK_COLUMNS[0])
+    + tuple(STATEMENT_COLUMNS.values()) + (NOTES_COLUMN, MONTH_COLUMNS[0])
+)
+PAYROLL_COLUMNS = (
+    ('user__employee_id', 'user__first_name', 'user__last_name', 'user__branch_name', 'user__bank_account_number')
+    + tuple(STATEMENT_COLUMNS) + ('notes', 'month')
+)
+
+
+def write_error_report(errors, file):
+    """يكتب أخطاء الاستيراد [(رقم الصف, رقم الموظف, العمود, السبب)] كـ xlsx في file."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('الأخطاء')
+    sheet.sheet_view.rightToLeft = True
+    sheet.append(ERROR_REPORT_HEADER)
+    for row in sorted(errors, key=lambda e: e[0]):
+        sheet.append(row)
+    workbook.save(file)
+
+
+class _ChunkBuffer:
+    """file object للكتابة بس: اللي بيتكتب بيتجمع لحد ما الـ generator ياخده (مش seekable)."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _StreamedSheetExcelWriter(ExcelWriter):
+    """ExcelWriter لشيت اتكتب بالفعل جوه الـ zip وقت الإضافة (مفيش ملف مؤقت ينسخه)."""
+
+    def write_worksheet(self, ws):
+        ws._drawing = SpreadsheetDrawing()
+        ws._rels = ws._writer._rels
+        self.manifest.append(ws)
+
+
+def stream_payroll_workbook(queryset, chunk_size=2000):
+    """
+    Generator بيطلّع bytes ملف xlsx لمفردات queryset وهو بيتكتب.
+    الصفوف بتتقرا بـ iterator(chunk_size) وتتكتب XML مضغوط على طول جوه الـ zip
+    (الـ zip بيتكتب لـ stream مش seekable بـ data descriptors)، فأول bytes بتطلع مع أول دفعة
+    والذاكرة ثابتة مهما كان عدد الصفوف.
+    """
+    buffer = _ChunkBuffer()
+    archive = zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('المرتبات')
+    sheet.sheet_view.rightToLeft = True
+    # الشيت الوحيد في الملف: ExcelWriter بيديله sheet1
+    entry = archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+    sheet._writer = WorksheetWriter(sheet, out=entry)
+    sheet._writer.write_top()
+
+    sheet.append(PAYROLL_HEADER)
+    # الـ local header بتاع الشيت: المتصفح يبدأ التحميل قبل أول دفعة
+    yield buffer.drain()
+    rows = queryset.values_list(*PAYROLL_COLUMNS).iterator(chunk_size=chunk_size)
+    for count, (employee_id, first_name, last_name, *values) in enumerate(rows, 1):
+        sheet.append((employee_id, f'{first_name} {last_name}'.strip(), *values))
+        if count % chunk_size == 0:
+            yield buffer.drain()
+
+    sheet.close()
+    entry.close()
+    _StreamedSheetExcelWriter(workbook, archive).save()
+    yield buffer.drain()
@@ -1,4 +1,31 @@
+from datetime import date
+
 from django import forms
+from .models import ImportMode
+from .readers import detect_format
 
 class UploadFileForm(forms.Form):
-    file = forms.FileField(label="اختر ملف Excel")
+    file = forms.FileField(label="اختر ملف المرتبات (Excel / CSV / Parquet / Feather)",
+                           error_messages={'required': 'لم يتم اختيار ملف'})
+    month = forms.DateField(label="شهر المرتب", required=False, input_formats=['%Y-%m', '%Y-%m-%d'],
+                            error_messages={'invalid': 'شهر غير صحيح'},
+                            widget=forms.DateInput(attrs={'type': 'month'}, format='%Y-%m'),
+                            initial=lambda: date.today().replace(day=1))
+    backfill = forms.BooleanField(label="شهور متعددة (الشهر من عمود «الشهر» في الملف)", required=False)
+    mode = forms.ChoiceField(label="طريقة الرفع", choices=ImportMode.choices,
+                             initial=ImportMode.REPLACE, required=False)
+    dry_run = forms.BooleanField(label="معاينة فقط (من غير حفظ)", required=False)
+    force = forms.BooleanField(label="إعادة الاستيراد حتى لو الملف اترفع قبل كده", required=False)
+
+    def clean_file(self):
+        # الصيغة من محتوى الملف نفسه مش من الامتداد
+        file = self.cleaned_data['file']
+        self.file_format = detect_format(file)
+        if self.file_format is None:
+            raise forms.ValidationError('صيغة الملف غير مدعومة (المدعوم: XLSX / CSV / Parquet / Feather)')
+        return file
+
+    def clean_month(self):
+        # أي يوم في الشهر -> أول الشهر؛ من غير اختيار = الشهر الحالي
+        month = self.cleaned_data['month'] or date.today()
+        return month.replace(day=1)
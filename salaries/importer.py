@@ -0,0 +1,592 @@
+"""
+محرك استيراد مفردات المرتب على دفعات (bulk) بدل صف-صف.
+"""
+import hashlib
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from accounts.search import build_search_text
+from .bulk import bulk_insert
+from .coercion import (
+    DECIMAL_FIELDS, EMPLOYEE_ID_COLUMN, MONTH_COLUMNS, STATEMENT_COLUMNS, ImportValidationError, clean_employee_id,
+    coerce_rows, parse_month, resolve_columns, resolve_month_column,
+)
+from .models import BranchPayrollSummary, ImportMode, SalaryStatement, SalaryStatementStage
+from .summaries import refresh_branch_summary
+
+IMPORT_BATCH_SIZE = 1000
+DEFAULT_PASSWORD = '0000'
+
+USER_SYNC_FIELDS = ['branch_name', 'bank_account_number', 'base_salary']
+
+# الحقول اللي بتدخل في بصمة الصف (وضع diff)
+FINGERPRINT_FIELDS = list(STATEMENT_COLUMNS) + ['notes']
+_DECIMAL_FIELDS = frozenset(DECIMAL_FIELDS)
+_CENT = Decimal('0.01')
+
+
+def fingerprint(values):
+    """بصمة لقيم المفردات (بنفس ترتيب FINGERPRINT_FIELDS) بعد توحيد شكل المبالغ."""
+    parts = []
+    for field, value in zip(FINGERPRINT_FIELDS, values):
+        if value is None or value == '':
+            parts.append('')
+        elif field in _DECIMAL_FIELDS:
+            parts.append(str(Decimal(value).quantize(_CENT)))
+        else:
+            parts.append(str(value))
+    return hashlib.blake2b('\x1f'.join(parts).encode(), digest_size=16).digest()
+
+
+def _apply_user_fields(user, record):
+    """يحدّث الحقول الثابتة على المستخدم، ويرجّع True لو حصل تغيير."""
+    changed = False
+    if record['branch'] and user.branch_name != record['branch']:
+        user.branch_name = record['branch']
+        changed = True
+    if record['bank'] and user.bank_account_number != record['bank']:
+        user.bank_account_number = record['bank']
+        changed = True
+    if record['base_salary'] is not None and user.base_salary != record['base_salary']:
+        user.base_salary = record['base_salary']
+        changed = True
+    return changed
+
+
+class SalaryImporter:
+    """
+    يستورد صفوف الشيت على دفعات ثابتة الحجم: تحويل وتحقق عمود عمود (coercion)
+    والصفوف الغلط بتتسجل في errors وتتساب،
+    استعلام واحد للموظفين لكل دفعة، وbulk_create للمفردات في جدول الـ staging.
+    الموظفين الجداد والحقول المتغيرة بيتجمعوا في الذاكرة وبيتكتبوا مع النشر:
+    publish() بتنشر الموظفين والشهر كله في transaction واحدة.
+    dry_run=True: نفس القراءة والتحقق والمقارنة بالموجود، من غير أي كتابة (معاينة).
+    """
+
+    def __init__(self, month, batch_size=IMPORT_BATCH_SIZE, on_progress=None, mode=ImportMode.REPLACE,
+                 use_copy=None, dry_run=False):
+        # on_progress(rows_in_batch, rate) بعد كل دفعة
+        # use_copy: None = COPY تلقائي على PostgreSQL، False = inserts على دفعات
+        self.month = month
+        self.dry_run = dry_run
+        self.branches = {}  # المعاينة: {الفرع: {'employees', 'net_salary'}}
+        self._new_ids = set()
+        self.use_copy = use_copy
+        self.mode = mode
+        self.stage_key = uuid.uuid4()
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.processed = 0
+        self.created_users = 0
+        self.updated_users = 0
+        self.started = None
+        self.index = None
+        self.rows_seen = 0
+        self._pending = []
+        self._lines = []
+        self.month_prepared = False
+        self.existing = {}  # وضع diff: {employee_id: [(statement_id, fingerprint), ...]}
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+        self._default_password_hash = None
+        self._new_users = {}        # {employee_id: CustomUser} لسه ما اتحفظوش
+        self._changed_users = {}    # {employee_id: CustomUser} حقول اتغيرت لسه ما اتحفظتش
+        self.timings = {}           # ثواني كل مرحلة: coerce / users / staging / publish
+        self.errors = []            # [(رقم الصف, رقم الموظف, العمود, السبب)]
+        self.rejected_ids = set()   # موظفين ليهم صفوف اترفضت
+        self.valid_ids = set()      # موظفين ليهم صف سليم واحد على الأقل
+
+    def run(self, header, rows):
+        """
+        header: أسماء الأعمدة، rows: أي iterable لـ (رقم الصف في الملف, tuple) زي القرّاء.
+        يرجّع إحصائيات العملية.
+        """
+        self.begin(header)
+        try:
+            for line, row in rows:
+                self.feed(row, line)
+            return self.finish()
+        except BaseException:
+            self.discard()
+            raise
+
+    def begin(self, header):
+        self.index = resolve_columns(header)
+        self.started = time.monotonic()
+
+    def feed(self, row, line=None):
+        """يضيف صف للدفعة الحالية؛ line رقم الصف في الملف (للأخطاء)."""
+        self.rows_seen += 1
+        self._pending.append(row)
+        self._lines.append(line if line is not None else self.rows_seen + 1)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def finish(self):
+        """آخر دفعة + نشر الشهر؛ لو فشل المستدعي مسؤول عن discard()."""
+        self._flush()
+        if self.errors and not self.processed:
+            # مفيش ولا صف سليم: مفيش حاجة تتنشر
+            raise ImportValidationError(self.errors)
+        self.publish()
+        return self.stats()
+
+    def _flush(self):
+        if self._pending:
+            rows, lines = self._pending, self._lines
+            self._pending, self._lines = [], []
+            self._load_batch(rows, lines)
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started if self.started else 0
+        return round(self.processed / elapsed, 1) if elapsed else 0.0
+
+    @contextmanager
+    def _timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    @property
+    def default_password_hash(self):
+        """
+        هاش كلمة المرور الافتراضية بيتحسب مرة واحدة لكل عملية استيراد (salt واحد للعملية)
+        بدل PBKDF2 كامل لكل موظف جديد. is_defult_password بيجبره يغيّرها أول دخول.
+        """
+        if self._default_password_hash is None:
+            self._default_password_hash = make_password(DEFAULT_PASSWORD)
+        return self._default_password_hash
+
+    def stats(self):
+        if self.dry_run:
+            return self.preview()
+        return {
+            'processed': self.processed,
+            'created_users': self.created_users,
+            'updated_users': self.updated_users,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'deleted': self.deleted,
+            'unchanged': self.unchanged,
+            'invalid_rows': len(self.errors),
+            'rate': self.rate,
+        }
+
+    def add_errors(self, errors):
+        """صفوف مرفوضة (اتسابت)؛ بتطلع في تقرير الأخطاء."""
+        self.errors += errors
+        self.rejected_ids.update(employee_id for _, employee_id, _, _ in errors if employee_id)
+
+    @property
+    def kept_ids(self):
+        """موظفين كل صفوفهم اترفضت: مفرداتهم القديمة ما تتمسحش (اللي ليه صف سليم بيتبدّل عادي)."""
+        return self.rejected_ids - self.valid_ids
+
+    def _coerce(self, rows, lines):
+        """تحويل الدفعة عمود عمود؛ الصفوف الغلط بتتسجل وبيكمل بالباقي."""
+        batch = coerce_rows(self.index, rows)
+        if batch.errors:
+            self.add_errors([
+                (lines[pos], batch.text['employee_id'][pos], column, reason)
+                for pos, column, reason in sorted(batch.errors)
+            ])
+        return list(batch.records())
+
+    def _prepare_month(self):
+        """وضع diff: قبل أول دفعة نحمّل بصمات مفردات الشهر الموجودة."""
+        if self.month_prepared:
+            return
+        if self.mode == ImportMode.DIFF or self.dry_run:
+            stored = (
+                SalaryStatement.objects.filter(month=self.month)
+                .values_list('id', 'user__employee_id', *FINGERPRINT_FIELDS)
+                .iterator(chunk_size=2000)
+            )
+            for pk, employee_id, *values in stored:
+                self.existing.setdefault(employee_id, []).append((pk, fingerprint(values)))
+        self.month_prepared = True
+
+    def _diff(self, records, staged):
+        """يرجّع الصفوف المتغيرة/الجديدة بس؛ المتغيرة بيتسجّل عليها statement_id."""
+        changes = []
+        for record, row in zip(records, staged):
+            entries = self.existing.get(record['employee_id'])
+            if not entries:
+                changes.append(row)
+                continue
+            pk, stored = entries.pop()
+            if stored == fingerprint(record['fields'][f] for f in FINGERPRINT_FIELDS):
+                self.unchanged += 1
+                continue
+            row.statement_id = pk
+            changes.append(row)
+        return changes
+
+    def _load_batch(self, rows, lines):
+        with self._timed('coerce'):
+            records = self._coerce(rows, lines)
+        self._prepare_month()
+        self.valid_ids.update(r['employee_id'] for r in records)
+        if self.dry_run:
+            with self._timed('preview'):
+                self._preview_batch(records)
+        else:
+            self._stage_batch(records)
+        self.processed += len(records)
+        if self.on_progress:
+            # عدد الصفوف المقروءة (السليمة والمرفوضة) عشان نسبة التقدّم توصل 100%
+            self.on_progress(len(rows), self.rate)
+
+    def _stage_batch(self, records):
+        with self._timed('users'):
+            users = self._sync_users(records)
+        staged = [
+            SalaryStatementStage(
+                stage_key=self.stage_key, employee_id=r['employee_id'], user_id=users.get(r['employee_id']),
+                month=self.month, **r['fields'],
+            )
+            for r in records
+        ]
+        if self.mode == ImportMode.DIFF:
+            staged = self._diff(records, staged)
+        with self._timed('staging'):
+            bulk_insert(SalaryStatementStage, staged, batch_size=self.batch_size, use_copy=self.use_copy)
+
+    def _preview_batch(self, records):
+        """المعاينة: نفس مقارنة diff + إجمالي الصافي لكل فرع، بقراءة بس."""
+        ids = {r['employee_id'] for r in records}
+        known = dict(CustomUser.objects.filter(employee_id__in=ids).values_list('employee_id', 'branch_name'))
+        for r in records:
+            eid = r['employee_id']
+            if eid not in known:
+                self._new_ids.add(eid)
+            branch = self.branches.setdefault(r['branch'] or known.get(eid) or '', {
+                'employees': 0, 'net_salary': Decimal(0),
+            })
+            branch['employees'] += 1
+            branch['net_salary'] += Decimal(r['fields']['net_salary'])
+
+            entries = self.existing.get(eid)
+            if not entries:
+                self.inserted += 1
+                continue
+            _, stored = entries.pop()
+            if stored == fingerprint(r['fields'][f] for f in FINGERPRINT_FIELDS):
+                self.unchanged += 1
+            else:
+                self.updated += 1
+
+    def preview(self):
+        """
+        ملخص المعاينة: موظفين جداد، مفردات جديدة/متغيرة/زي ما هي/هتتشال (مش في الملف)،
+        الصفوف المرفوضة، وإجمالي الصافي لكل فرع قدام الشهر اللي فات.
+        """
+        previous_month = (self.month - timedelta(days=1)).replace(day=1)
+        # الشهر اللي فات من جدول إجماليات الفروع بدل تجميع مفرداته
+        previous = {
+            row['branch_name']: row
+            for row in BranchPayrollSummary.objects.filter(month=previous_month)
+            .values('branch_name', 'employees', 'net_salary')
+        }
+        branches = []
+        for name in sorted(set(self.branches) | set(previous)):
+            current = self.branches.get(name, {'employees': 0, 'net_salary': Decimal(0)})
+            before = previous.get(name, {'employees': 0, 'net_salary': None})
+            before_net = before['net_salary'] or Decimal(0)
+            branches.append({
+                'branch': name,
+                'employees': current['employees'],
+                'net_salary': str(current['net_salary'].quantize(_CENT)),
+                'previous_employees': before['employees'],
+                'previous_net_salary': str(before_net.quantize(_CENT)),
+                'difference': str((current['net_salary'] - before_net).quantize(_CENT)),
+            })
+        kept = self.kept_ids
+        return {
+            'dry_run': True,
+            'processed': self.processed,
+            'new_employees': len(self._new_ids),
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'deleted': sum(
+                len(entries) for eid, entries in self.existing.items() if eid not in kept
+            ),
+            'invalid_rows': len(self.errors),
+            'previous_month': previous_month.strftime('%Y-%m'),
+            'branches': branches,
+            'rate': self.rate,
+        }
+
+    def _insert_from_stage(self, now):
+        """INSERT ... SELECT من الـ staging للصفوف الجديدة (من غير ما تعدّي على Python)."""
+        columns = ['user', 'month'] + FINGERPRINT_FIELDS
+        qn = connection.ops.quote_name
+        target = ', '.join(qn(SalaryStatement._meta.get_field(f).column) for f in columns)
+        source = ', '.join(qn(SalaryStatementStage._meta.get_field(f).column) for f in columns)
+        stage_key = SalaryStatementStage._meta.get_field('stage_key').get_db_prep_value(self.stage_key, connection)
+        sql = (
+            f"INSERT INTO {qn(SalaryStatement._meta.db_table)} ({target}, {qn('updated_at')}) "
+            f"SELECT {source}, %s FROM {qn(SalaryStatementStage._meta.db_table)} "
+            f"WHERE {qn('stage_key')} = %s AND {qn('statement_id')} IS NULL"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [now, stage_key])
+            return cursor.rowcount
+
+    def publish(self):
+        """ينشر الـ staging على SalaryStatement في transaction واحدة قصيرة."""
+        if self.dry_run:
+            return
+        with self._timed('publish'):
+            self._publish()
+
+    def _publish(self):
+        staged = SalaryStatementStage.objects.filter(stage_key=self.stage_key)
+        kept = self.kept_ids
+        stale = [
+            pk for employee_id, entries in self.existing.items() if employee_id not in kept
+            for pk, _ in entries
+        ]
+        now = timezone.now()
+        with transaction.atomic():
+            self._save_users(staged)
+            if self.mode == ImportMode.DIFF:
+                # المفردات اللي ما ظهرتش في الملف تتمسح
+                for i in range(0, len(stale), self.batch_size):
+                    SalaryStatement.objects.filter(pk__in=stale[i:i + self.batch_size]).delete()
+                self.deleted = len(stale)
+                updates = [
+                    SalaryStatement(pk=row.statement_id, updated_at=now,
+                                    **{f: getattr(row, f) for f in FINGERPRINT_FIELDS})
+                    for row in staged.filter(statement_id__isnull=False).iterator(chunk_size=self.batch_size)
+                ]
+                SalaryStatement.objects.bulk_update(
+                    updates, FINGERPRINT_FIELDS + ['updated_at'], batch_size=self.batch_size,
+                )
+                self.updated = len(updates)
+            else:
+                self.deleted = (
+                    SalaryStatement.objects.filter(month=self.month)
+                    .exclude(user__employee_id__in=kept).delete()[0]
+                )
+            self.inserted = self._insert_from_stage(now)
+            staged.delete()
+            # إجماليات الفروع بتتنشر مع الشهر نفسه
+            refresh_branch_summary(self.month)
+        self.existing = {}
+
+    def discard(self):
+        """فشل الاستيراد: نمسح الـ staging والبيانات المنشورة ما اتلمستش."""
+        if self.dry_run:
+            return
+        SalaryStatementStage.objects.filter(stage_key=self.stage_key).delete()
+
+    def _sync_users(self, records):
+        """
+        يرجّع {employee_id: user_id} لموظفي الدفعة الموجودين (الجداد مش فيه)،
+        ويجمّع الموظفين الجداد والحقول المتغيرة لحد النشر.
+        """
+        pending = {**self._changed_users, **self._new_users}
+        ids = {r['employee_id'] for r in records} - set(self._new_users)
+        users = {
+            u.employee_id: u
+            for u in CustomUser.objects.filter(employee_id__in=ids).only('id', 'employee_id', *USER_SYNC_FIELDS)
+        }
+        # موظف اتغير في دفعة قبل كده: نكمّل على نفس النسخة
+        users.update((eid, user) for eid, user in self._changed_users.items() if eid in users)
+
+        for r in records:
+            eid = r['employee_id']
+            user = users.get(eid) or pending.get(eid)
+            if user is None:
+                name = r['name']
+                user = CustomUser(
+                    username=eid,
+                    employee_id=eid,
+                    first_name=name.split()[0] if name else '',
+                    last_name=' '.join(name.split()[1:]) if name else '',
+                    role='user',
+                    is_defult_password=True,
+                )
+                # bulk_create مش بينادي save()
+                user.search_text = build_search_text(user)
+                user.password = self.default_password_hash
+                self._new_users[eid] = pending[eid] = user
+            if _apply_user_fields(user, r) and eid in users:
+                self._changed_users[eid] = user
+
+        return {eid: user.pk for eid, user in users.items()}
+
+    def _save_users(self, staged):
+        """
+        جوه transaction النشر: يحفظ الموظفين الجداد والحقول المتغيرة ويربط صفوف الـ staging
+        اللي لسه من غير user، فلو النشر فشل مفيش تعديل على الموظفين بيفضل.
+        """
+        new_users = self._new_users
+        # موظف جديد ممكن يكون اتعمل من وقت الـ staging (شهر تاني في نفس الـ backfill مثلًا)
+        for user in CustomUser.objects.filter(employee_id__in=list(new_users)).only('id', 'employee_id',
+                                                                                    *USER_SYNC_FIELDS):
+            pending = new_users.pop(user.employee_id)
+            if _apply_user_fields(user, {'branch': pending.branch_name, 'bank': pending.bank_account_number,
+                                         'base_salary': pending.base_salary}):
+                self._changed_users[user.employee_id] = user
+
+        if new_users:
+            CustomUser.objects.bulk_create(new_users.values(), batch_size=self.batch_size)
+            self.created_users += len(new_users)
+        # شهر قديم (رفع متأخر أو backfill) مايغيّرش بيانات الموظف الحالية: الفرع والحساب والأساسي
+        # بيتاخدوا بس من شهر مش أقدم من آخر شهر متسجل للموظف
+        newer = self._employees_with_newer_months(self._changed_users)
+        changed = {eid: user for eid, user in self._changed_users.items() if eid not in newer}
+        if changed:
+            CustomUser.objects.bulk_update(changed.values(), USER_SYNC_FIELDS, batch_size=self.batch_size)
+            self.updated_users += len(changed)
+        self._new_users, self._changed_users = {}, {}
+
+        staged.filter(user__isnull=True).update(user_id=Subquery(
+            CustomUser.objects.filter(employee_id=OuterRef('employee_id')).values('id')[:1]
+        ))
+
+    def _employees_with_newer_months(self, employee_ids):
+        """الموظفين اللي ليهم مفردات في شهر أحدث من شهر الاستيراد."""
+        employee_ids = list(employee_ids)
+        newer = set()
+        for i in range(0, len(employee_ids), self.batch_size):
+            newer.update(
+                SalaryStatement.objects.filter(user__employee_id__in=employee_ids[i:i + self.batch_size])
+                .values('user__employee_id').annotate(latest=Max('month')).filter(latest__gt=self.month)
+                .values_list('user__employee_id', flat=True)
+            )
+        return newer
+
+
+class BackfillImporter:
+    """
+    استيراد شهور كتير من ملف واحد (تاريخ قديم مثلًا): كل صف بيروح لشهره حسب عمود الشهر،
+    ولكل شهر SalaryImporter بـ staging خاص بيه. النشر شهر شهر بالترتيب، كل شهر في transaction
+    لوحده؛ لو شهر فشل، الشهور اللي قبله بتفضل منشورة واللي بعده بتتلغي.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, on_progress=None, mode=ImportMode.REPLACE, use_copy=None,
+                 dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.on_progress = on_progress
+        self.mode = mode
+        self.use_copy = use_copy
+        self.importers = {}  # {month: SalaryImporter}
+        self.published = []
+        self.started = None
+        self._errors = []
+        self.rejected_ids = set()  # موظفين ليهم صفوف اترفضت قبل ما نعرف شهرها
+
+    @property
+    def processed(self):
+        return sum(importer.processed for importer in self.importers.values())
+
+    def add_errors(self, errors):
+        """
+        صفوف اترفضت قبل التوزيع على الشهور (قراءة الشيت أو شهر غلط): شهرها مش معروف،
+        فالموظف بيتحسب مرفوض في كل الشهور عشان مفرداته القديمة ما تتمسحش في وضع replace.
+        """
+        self._errors += errors
+        ids = {employee_id for _, employee_id, _, _ in errors if employee_id}
+        self.rejected_ids |= ids
+        for importer in self.importers.values():
+            importer.rejected_ids |= ids
+
+    @property
+    def errors(self):
+        errors = self._errors + [e for importer in self.importers.values() for e in importer.errors]
+        return sorted(errors, key=lambda e: e[0])
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started if self.started else 0
+        return round(self.processed / elapsed, 1) if elapsed else 0.0
+
+    def _importer(self, month, header):
+        importer = self.importers.get(month)
+        if importer is None:
+            importer = SalaryImporter(
+                month, batch_size=self.batch_size, mode=self.mode, use_copy=self.use_copy,
+                on_progress=self._child_progress, dry_run=self.dry_run,
+            )
+            # هاش كلمة السر الافتراضية واحد لكل الشهور
+            if self.importers:
+                importer._default_password_hash = next(iter(self.importers.values())).default_password_hash
+            importer.begin(header)
+            importer.rejected_ids |= self.rejected_ids
+            self.importers[month] = importer
+        return importer
+
+    def _child_progress(self, rows, rate):
+        if self.on_progress:
+            self.on_progress(rows, self.rate)
+
+    def run(self, header, rows):
+        index = resolve_columns(header)
+        month_i = resolve_month_column(index)
+        self.started = time.monotonic()
+        months = {}
+        try:
+            for line, row in rows:
+                text = row[month_i]
+                month = months.get(text)
+                if month is None:
+                    month = months[text] = parse_month(text)
+                if month is None:
+                    self.add_errors([(line, clean_employee_id(row[index[EMPLOYEE_ID_COLUMN]]), MONTH_COLUMNS[0],
+                                      f'شهر غير صحيح: {text}' if text else 'خانة فاضية')])
+                    continue
+                self._importer(month, header).feed(row, line)
+            for importer in self.importers.values():
+                importer._flush()
+            if self._errors and self.on_progress:
+                self.on_progress(len(self._errors), self.rate)
+            if not self.processed:
+                raise ImportValidationError(self.errors)
+            for month in sorted(self.importers):
+                if not self.importers[month].processed:
+                    continue  # كل صفوف الشهر اترفضت
+                self.importers[month].finish()
+                self.published.append(month)
+        except BaseException:
+            for month, importer in self.importers.items():
+                if month not in self.published:
+                    importer.discard()
+            raise
+        return self.stats()
+
+    def stats(self):
+        totals = dict.fromkeys(['processed', 'invalid_rows'], 0)
+        months = {}
+        for month, importer in sorted(self.importers.items()):
+            stats = months[month.strftime('%Y-%m')] = importer.stats()
+            del stats['rate']
+            for key, value in stats.items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    totals[key] = totals.get(key, 0) + value
+        totals['invalid_rows'] += len(self._errors)
+        if self.dry_run:
+            # الموظف الجديد ممكن يظهر في كذا شهر
+            totals['dry_run'] = True
+            totals['new_employees'] = len(set().union(*(i._new_ids for i in self.importers.values())))
+        totals['rate'] = self.rate
+        totals['months'] = months
+        return totals
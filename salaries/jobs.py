@@ -0,0 +1,456 @@
+"""
+طابور مهام رفع المرتبات في قاعدة البيانات.
+الـ worker بيحجز المهمة بـ SELECT ... FOR UPDATE SKIP LOCKED فممكن يشتغل أكتر من worker
+على أكتر من process/سيرفر، والمهمة اللي يموت الـ worker بتاعها بترجع للطابور بعد JOB_LEASE.
+"""
+import csv
+import hashlib
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from xml.etree.ElementTree import ParseError
+from zipfile import BadZipFile
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import DataError, IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .coercion import CANONICAL_COLUMNS, ImportValidationError
+from .exports import write_error_report
+from .importer import BackfillImporter, SalaryImporter
+from .models import (
+    ExcelUploadLog, ImportFormat, ImportJobStatus, ImportMode, JobKind, SalaryImportJob, SalaryStatementStage,
+)
+from .readers import data_sheet_names, open_reader, parse_sheet
+from .slips import batch_pdf, month_slips, purge_slip_cache, slips_filename
+
+JOB_LEASE = timedelta(minutes=10)    # مدة الحجز من غير نبض قبل ما المهمة ترجع للطابور
+RETRY_DELAY = timedelta(minutes=1)   # تتضرب في رقم المحاولة
+STAGE_TTL = timedelta(days=1)        # صفوف staging يتيمة من worker مات
+SLIP_OUTPUT_TTL = timedelta(days=1)  # ملف PDF مهمة الكشوف بيتمسح بعدها (الكشوف نفسها في الكاش)
+CLAIM_LOCK_ID = 0x5a1a7e5            # مفتاح pg_advisory_xact_lock لحجز المهام
+
+# ملف بايظ أو قيم القاعدة رفضتها: نفس الملف هيفشل تاني، فالمهمة بتفشل على طول من غير retry
+# (ArrowInvalid بتاعة pyarrow من ValueError)
+PERMANENT_ERRORS = (BadZipFile, InvalidFileException, ParseError, csv.Error, UnicodeDecodeError, ValueError,
+                    DataError)
+# المهام اللي بتكتب في مفردات الشهر: شهر واحد في المرة. المعاينة ومهام الكشوف بتقرا بس
+WRITING_JOBS = Q(kind=JobKind.IMPORT, dry_run=False)
+
+
+def get_progress(upload_id: str):
+    """حالة الرفع من صف المهمة (مشتركة بين كل الـ processes)."""
+    try:
+        job = SalaryImportJob.objects.filter(pk=upload_id).first()
+    except ValidationError:
+        return {}
+    if job is None:
+        return {}
+    state = job.progress_state()
+    if job.error_report:
+        state['error_report_url'] = reverse('salary-upload-errors', args=[job.pk])
+    if job.status == ImportJobStatus.QUEUED:
+        state['queue_position'] = queue_position(job)
+    return state
+
+
+def queue_position(job):
+    """ترتيب المهمة وسط مهام نفس الشهر (1 = الدور عليها)؛ backfill بيستنى كل اللي قبله."""
+    earlier = SalaryImportJob.objects.filter(
+        created_at__lt=job.created_at, status__in=[ImportJobStatus.QUEUED, ImportJobStatus.RUNNING],
+    )
+    if job.kind == JobKind.IMPORT and not job.dry_run:
+        earlier = earlier.filter(WRITING_JOBS)
+        if not job.backfill:
+            earlier = earlier.filter(Q(month=job.month) | Q(backfill=True))
+    return earlier.count() + 1
+
+
+def _set_progress(job, **data):
+    """يحدّث إحصائيات العرض (rate وغيرها) بـ UPDATE واحد من غير read-modify-write."""
+    job.progress.update(data)
+    SalaryImportJob.objects.filter(pk=job.pk).update(progress=job.progress)
+
+
+def _add_processed(job, rows, **data):
+    """زيادة ذرّية للعداد (F expression) + نبض الحجز في نفس الـ UPDATE."""
+    job.progress.update(data)
+    SalaryImportJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        processed=F('processed') + rows, progress=job.progress, locked_at=timezone.now(),
+    )
+
+
+@contextmanager
+def _lease_heartbeat(job, interval=None):
+    """
+    نبض للحجز من thread جنبي طول ما المهمة شغالة: الـ parse متعدد الشيتات والـ publish
+    مش بيحدّثوا التقدّم، ومن غير نبض المهمة ممكن ترجع للطابور وتتنفذ مرتين.
+    """
+    interval = JOB_LEASE.total_seconds() / 4 if interval is None else interval
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    SalaryImportJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+                        locked_at=timezone.now(),
+                    )
+                except Exception:
+                    # قاعدة مشغولة/اتصال وقع: نحاول في النبضة الجاية
+                    connection.close()
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'salary-job-{job.pk}-lease', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class HashingFile(File):
+    """بيحسب sha256 للمحتوى وهو بيتكتب على الـ storage (من غير قراءة تانية للملف)."""
+
+    def __init__(self, file, name=None):
+        super().__init__(file, name)
+        self.sha256 = hashlib.sha256()
+
+    def chunks(self, chunk_size=None):
+        for chunk in self.file.chunks(chunk_size):
+            self.sha256.update(chunk)
+            yield chunk
+
+    def read(self, *args):
+        data = self.file.read(*args)
+        self.sha256.update(data)
+        return data
+
+
+def find_duplicate(month, digest):
+    """
+    نفس الملف لنفس الشهر: يا إما آخر رفع ناجح للشهر، يا إما مهمة لسه في الطابور/شغالة.
+    """
+    latest = ExcelUploadLog.objects.filter(month=month).order_by('-upload_time').first()
+    if latest and latest.content_sha256 == digest:
+        return latest
+    return SalaryImportJob.objects.filter(
+        month=month, content_sha256=digest,
+        status__in=[ImportJobStatus.QUEUED, ImportJobStatus.RUNNING],
+    ).first()
+
+
+def enqueue_job(uploaded_file, uploader, mode=ImportMode.REPLACE, force=False, file_format=ImportFormat.XLSX,
+                month=None, backfill=False, dry_run=False):
+    """
+    يحفظ الملف على الـ storage ويضيف مهمة في الطابور.
+    month: شهر المرتب (افتراضيًا الشهر الحالي)؛ backfill: الشهر من عمود في الملف (month بيتجاهل).
+    dry_run: معاينة من غير حفظ (ومن غير فحص التكرار).
+    يرجّع (job, duplicate): لو الملف متطابق مع آخر استيراد للشهر ومفيش force
+    الملف بيتمسح ومفيش مهمة (job=None).
+    """
+    if backfill:
+        month = None
+    elif month is None:
+        month = datetime.now().date().replace(day=1)
+    job = SalaryImportJob(uploader=uploader, file_name=uploaded_file.name, mode=mode, month=month,
+                          backfill=backfill, dry_run=dry_run, file_format=file_format)
+    content = HashingFile(uploaded_file, uploaded_file.name)
+    job.file.save(uploaded_file.name, content, save=False)
+    job.content_sha256 = content.sha256.hexdigest()
+
+    duplicate = None if force or dry_run else find_duplicate(month, job.content_sha256)
+    if duplicate:
+        job.file.storage.delete(job.file.name)
+        return None, duplicate
+    job.save()
+    return job, None
+
+
+def enqueue_slips_job(month, branch, requester):
+    """
+    مهمة تجميع كشوف شهر/فرع في PDF واحد؛ لو فيه مهمة لنفس الشهر/الفرع لسه ما خلصتش بترجع هي.
+    مابتكتبش في المفردات، فبتشتغل جنب رفع نفس الشهر زي المعاينة (WRITING_JOBS).
+    """
+    job = SalaryImportJob.objects.filter(
+        kind=JobKind.SLIPS, month=month, branch_name=branch,
+        status__in=[ImportJobStatus.QUEUED, ImportJobStatus.RUNNING],
+    ).first()
+    if job is None:
+        job = SalaryImportJob.objects.create(
+            kind=JobKind.SLIPS, uploader=requester, month=month, branch_name=branch,
+            file_name=slips_filename(month, branch),
+        )
+    return job
+
+
+def claim_job(worker_id):
+    """يحجز أقدم مهمة جاهزة (أو مهمة worker مات) ويرجّعها، أو None لو الطابور فاضي."""
+    now = timezone.now()
+    stale = now - JOB_LEASE
+
+    # مهام استهلكت محاولاتها والـ worker بتاعها مات: تتقفل كفشل
+    SalaryImportJob.objects.filter(
+        status=ImportJobStatus.RUNNING, locked_at__lt=stale, attempts__gte=F('max_attempts'),
+    ).update(status=ImportJobStatus.ERROR, error='توقف الـ worker أثناء المعالجة', finished_at=now)
+    SalaryStatementStage.objects.filter(created_at__lt=now - STAGE_TTL).delete()
+    _purge_slip_outputs(now - SLIP_OUTPUT_TTL)
+
+    skipped = set()
+    for _ in range(5):
+        job = None
+        try:
+            with transaction.atomic():
+                # الفحص والحجز تحت نفس القفل: من غير كده worker تاني ممكن يحجز backfill
+                # (month=NULL مش داخل في الـ unique constraint) وبعدين شهر عادي في نفس اللحظة
+                _lock_claims()
+                job = (
+                    _ready_jobs(stale).select_for_update(skip_locked=True)
+                    .filter(
+                        Q(status=ImportJobStatus.QUEUED, run_after__lte=now) |
+                        Q(status=ImportJobStatus.RUNNING, locked_at__lt=stale)
+                    )
+                    .exclude(month__in=skipped)
+                    .order_by('created_at')
+                    .first()
+                )
+                if job is None:
+                    return None
+                job.status = ImportJobStatus.RUNNING
+                job.attempts += 1
+                job.locked_by = worker_id
+                job.locked_at = now
+                job.save(update_fields=['status', 'attempts', 'locked_by', 'locked_at'])
+            return job
+        except IntegrityError:
+            # worker تاني لسه حاجز مهمة لنفس الشهر في نفس اللحظة
+            skipped.add(job.month)
+    return None
+
+
+def _lock_claims():
+    """قفل على مستوى القاعدة لحد آخر الـ transaction (PostgreSQL)؛ SQLite بيكتب واحد واحد أصلًا."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_ID])
+
+
+def _ready_jobs(stale):
+    """
+    الشهور اللي عليها مهمة شغالة فعلًا (مش ميتة) مالهاش دعوة بالـ claim دلوقتي؛
+    مهمة backfill بتلمس شهور كتير فبتشتغل لوحدها. المعاينة والكشوف مش بتكتب فبتشتغل في أي وقت.
+    """
+    running = SalaryImportJob.objects.filter(WRITING_JOBS, status=ImportJobStatus.RUNNING, locked_at__gte=stale)
+    busy = running.filter(month__isnull=False).values('month')
+    if running.filter(backfill=True).exists():
+        return SalaryImportJob.objects.exclude(WRITING_JOBS)
+    if running.exists():
+        return SalaryImportJob.objects.filter(~WRITING_JOBS | (~Q(month__in=busy) & Q(backfill=False)))
+    return SalaryImportJob.objects.all()
+
+
+def _purge_slip_outputs(before):
+    """يمسح ملفات PDF مهام الكشوف اللي خلصت قبل before؛ طلب الكشوف تاني بيعمل مهمة جديدة."""
+    old = SalaryImportJob.objects.filter(kind=JobKind.SLIPS, finished_at__lt=before).exclude(output='')
+    for job in old.only('id', 'output'):
+        try:
+            job.output.storage.delete(job.output.name)
+        except Exception:
+            continue
+        SalaryImportJob.objects.filter(pk=job.pk).update(output='')
+
+
+def _finish(job, status, error=''):
+    # الملف مالوش لازمة بعد الحالة النهائية
+    try:
+        if job.file:
+            job.file.storage.delete(job.file.name)
+    except Exception:
+        pass
+    SalaryImportJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=status, error=error, finished_at=timezone.now(),
+    )
+
+
+def _retry_or_fail(job, error):
+    if job.attempts >= job.max_attempts:
+        _finish(job, ImportJobStatus.ERROR, error)
+        return
+    SalaryImportJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=ImportJobStatus.QUEUED, error=error, locked_by='', locked_at=None,
+        run_after=timezone.now() + RETRY_DELAY * job.attempts,
+    )
+
+
+def _save_error_report(job, errors):
+    """تقرير الصفوف المرفوضة على الـ storage جنب المهمة."""
+    if not errors:
+        return
+    with tempfile.TemporaryFile() as tmp:
+        write_error_report(errors, tmp)
+        tmp.seek(0)
+        name = f'{os.path.splitext(job.file_name)[0]}_errors.xlsx'
+        job.error_report.save(name, File(tmp), save=False)
+    SalaryImportJob.objects.filter(pk=job.pk).update(error_report=job.error_report.name)
+
+
+@contextmanager
+def _local_path(job):
+    """مسار محلي للملف (الـ process pool محتاج مسار)؛ storage بعيد بيتنزل في ملف مؤقت."""
+    try:
+        path = job.file.path
+    except NotImplementedError:
+        path = None
+    if path:
+        yield path
+        return
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(job.file.name)[1]) as tmp:
+        with job.file.open('rb') as fh:
+            shutil.copyfileobj(fh, tmp)
+        tmp.flush()
+        yield tmp.name
+
+
+def _import_sheets(job, path, names, importer):
+    """
+    ملف فيه أكتر من شيت (شيت لكل فرع): كل شيت بيتقرا ويتحقق منه في process لوحده
+    بالتوازي، وبعدين الصفوف كلها بتدخل استيراد واحد (bulk load + publish واحد).
+    """
+    sheets = {name: {'status': 'parsing', 'rows': 0} for name in names}
+    _set_progress(job, sheets=sheets)
+
+    parsed, errors = {}, []
+    workers = min(len(names), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        futures = {pool.submit(parse_sheet, path, name): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            rows, sheet_errors = future.result()
+            parsed[name] = rows
+            errors += sheet_errors
+            sheets[name] = {'status': 'parsed', 'rows': len(rows), 'invalid_rows': len(sheet_errors)}
+            _set_progress(job, sheets=sheets)
+    # الصفوف المرفوضة بتتساب وبتطلع في تقرير الأخطاء
+    importer.add_errors(errors)
+
+    SalaryImportJob.objects.filter(pk=job.pk).update(total=sum(len(rows) for rows in parsed.values()))
+
+    def rows():
+        for name in names:
+            sheets[name]['status'] = 'loading'
+            _set_progress(job, sheets=sheets)
+            yield from parsed.pop(name)
+            sheets[name]['status'] = 'loaded'
+
+    stats = importer.run(CANONICAL_COLUMNS, rows())
+    _set_progress(job, sheets=sheets)
+    return stats
+
+
+def run_job(job):
+    """
+    معالجة الإكسل + تحديث التقدّم على صف المهمة (والحجز بيتجدد طول التنفيذ).
+    """
+    with _lease_heartbeat(job):
+        _run_job(job)
+
+
+def _run_slips_job(job):
+    """يحوّل كشوف الشهر/الفرع (الناقص من الكاش بس) ويحفظ الـ PDF المجمّع على الـ storage."""
+    slips = month_slips(job.month, job.branch_name)
+    total = slips.count()
+    if not total:
+        _finish(job, ImportJobStatus.ERROR, 'مفيش كشوف للشهر/الفرع ده')
+        return
+    SalaryImportJob.objects.filter(pk=job.pk).update(total=total)
+    with tempfile.TemporaryFile() as tmp:
+        rendered = batch_pdf(slips, tmp, on_progress=lambda count: _add_processed(job, count))
+        tmp.seek(0)
+        job.output.save(job.file_name, File(tmp), save=False)
+    SalaryImportJob.objects.filter(pk=job.pk).update(output=job.output.name)
+    _set_progress(job, slips=total, rendered=rendered)
+    _finish(job, ImportJobStatus.DONE)
+
+
+def _purge_slip_cache():
+    """كشوف المفردات اللي اتمسحت أو اتبدلت؛ فشل المسح مايفشّلش رفع اتنشر خلاص."""
+    try:
+        purge_slip_cache()
+    except OSError:
+        pass
+
+
+def _run_job(job):
+    try:
+        # محاولة جديدة تبدأ العدّاد من الأول
+        job.progress = {}
+        SalaryImportJob.objects.filter(pk=job.pk).update(processed=0, total=0, progress={}, error_report='')
+        if job.kind == JobKind.SLIPS:
+            _run_slips_job(job)
+            return
+
+        def on_progress(rows, rate):
+            _add_processed(job, rows, rate=rate)
+
+        if job.backfill:
+            importer = BackfillImporter(on_progress=on_progress, mode=job.mode, dry_run=job.dry_run)
+        else:
+            # شهر المهمة (أول يوم في الشهر)
+            importer = SalaryImporter(job.month or datetime.now().date().replace(day=1),
+                                      on_progress=on_progress, mode=job.mode, dry_run=job.dry_run)
+        with _local_path(job) as path:
+            # شيت لكل فرع بس لو فيه أكتر من شيت فيه بيانات (Sheet2 فاضي ما يخليهوش multi-sheet)
+            names = data_sheet_names(path) if job.file_format == ImportFormat.XLSX else []
+            if len(names) > 1:
+                stats = _import_sheets(job, path, names, importer)
+            else:
+                # شيت واحد / CSV / Parquet / Feather: قراءة streaming بذاكرة ثابتة
+                with open_reader(path, job.file_format, names[0] if names else None) as reader:
+                    SalaryImportJob.objects.filter(pk=job.pk).update(total=reader.total)
+                    stats = importer.run(reader.header, reader)
+
+        # سجل رفع واحد لكل شهر (بدل ما يبقى لكل صف)؛ المعاينة مالهاش سجل
+        ExcelUploadLog.objects.bulk_create([] if job.dry_run else [
+            ExcelUploadLog(
+                uploader_id=job.uploader_id,
+                file_name=job.file_name,
+                sheet_name='، '.join(names)[:255] or job.get_file_format_display(),
+                month=month,
+                content_sha256=job.content_sha256,
+            )
+            for month in (importer.published if job.backfill else [importer.month])
+        ])
+
+        _save_error_report(job, importer.errors)
+        _set_progress(job, **stats)
+        _finish(job, ImportJobStatus.DONE)
+        if not job.dry_run:
+            _purge_slip_cache()
+
+    except KeyError as e:
+        # عمود ناقص أو بيانات غلط مش هيتصلحوا بإعادة المحاولة
+        _finish(job, ImportJobStatus.ERROR, f'عمود مفقود في الملف: {e}')
+    except ImportValidationError as e:
+        # مفيش ولا صف سليم
+        _save_error_report(job, e.errors)
+        _finish(job, ImportJobStatus.ERROR, str(e))
+    except PERMANENT_ERRORS as e:
+        _finish(job, ImportJobStatus.ERROR, f'الملف أو بياناته غير صالحة: {e}')
+    except Exception as e:
+        _retry_or_fail(job, str(e))
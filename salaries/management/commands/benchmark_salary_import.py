@@ -0,0 +1,135 @@
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from salaries.importer import SalaryImporter
+from salaries.models import ImportMode
+from salaries.readers import detect_format, open_reader
+from salaries.synthetic import write_payroll_file
+
+
+class Command(BaseCommand):
+    help = (
+        'يقيس مراحل استيراد المرتبات (قراءة / تحويل / موظفين / staging / نشر) والذاكرة، '
+        'ويكتب النتايج JSON. كل الكتابة في القاعدة بتترجع (rollback) في الآخر.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*',
+                            help='ملفات للقياس؛ من غيرها بيتعمل شيتات وهمية بأحجام --rows')
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--mode', choices=ImportMode.values, default=ImportMode.REPLACE)
+        parser.add_argument('--month', default='2000-01', help='الشهر اللي الاستيراد بيتعمل عليه (YYYY-MM)')
+        parser.add_argument('--no-copy', action='store_true', help='bulk_create بدل COPY على PostgreSQL')
+        parser.add_argument('--no-trace-memory', dest='trace_memory', action='store_false',
+                            help='من غير tracemalloc (توقيت أدق، من غير أرقام ذاكرة)')
+        parser.add_argument('--output', default='', help='ملف JSON للنتايج (الافتراضي stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            month = datetime.strptime(options['month'], '%Y-%m').date()
+        except ValueError:
+            raise CommandError('--month لازم يكون YYYY-MM')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            files = options['files']
+            if not files:
+                files = []
+                for count in options['rows']:
+                    path = os.path.join(tmp, f'payroll_{count}.xlsx')
+                    write_payroll_file(path, count)
+                    files.append(path)
+
+            results = [self._measure(path, month, options) for path in files]
+
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'mode': options['mode'],
+            'results': results,
+        }
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                fh.write(data)
+            self.stdout.write(f"النتايج في {options['output']}")
+        else:
+            self.stdout.write(data)
+
+    def _measure(self, path, month, options):
+        with open(path, 'rb') as fh:
+            file_format = detect_format(fh)
+        if file_format is None:
+            raise CommandError(f'صيغة غير مدعومة: {path}')
+
+        trace = options['trace_memory']
+        stages = {}
+
+        def stage(name, seconds, rows=None, peak=True, **extra):
+            stages[name] = {'seconds': round(seconds, 4), **extra}
+            if rows is not None:
+                stages[name]['rows_per_sec'] = round(rows / seconds, 1) if seconds else None
+            if trace and peak:
+                stages[name]['peak_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+                tracemalloc.reset_peak()
+
+        # القراءة بتغذّي الـ importer على طول زي run_job (من غير list للملف كله)،
+        # ووقتها بيتجمع من next() على القارئ
+        read = {'seconds': 0.0, 'rows': 0}
+
+        def timed(reader):
+            rows = iter(reader)
+            while True:
+                start = time.perf_counter()
+                item = next(rows, None)
+                read['seconds'] += time.perf_counter() - start
+                if item is None:
+                    return
+                read['rows'] += 1
+                yield item
+
+        # الذاكرة لكل ملف لوحده: tracemalloc بيبدأ من الصفر مع كل ملف
+        if trace:
+            tracemalloc.start()
+        try:
+            importer = SalaryImporter(month, mode=options['mode'], use_copy=False if options['no_copy'] else None)
+            with transaction.atomic():
+                start = time.perf_counter()
+                with open_reader(path, file_format) as reader:
+                    importer.begin(reader.header)
+                    for line, row in timed(reader):
+                        importer.feed(row, line)
+                    importer._flush()
+                load = time.perf_counter() - start
+                stage('read', read['seconds'], read['rows'], peak=False)
+                # تفصيل التحميل من عدّادات الـ importer نفسه (القراءة متضمنة في peak_kb)
+                stage('load', load - read['seconds'], read['rows'], **{
+                    name: round(importer.timings.get(name, 0.0), 4) for name in ('coerce', 'users', 'staging')
+                })
+                importer.finish()
+                stage('publish', importer.timings.get('publish', 0.0))
+                total = time.perf_counter() - start
+                # القياس مايسيبش أي بيانات وراه
+                transaction.set_rollback(True)
+        finally:
+            if trace:
+                tracemalloc.stop()
+
+        return {
+            'file': os.path.basename(path),
+            'format': file_format,
+            'size_bytes': os.path.getsize(path),
+            'rows': read['rows'],
+            'imported': importer.processed,
+            'invalid_rows': len(importer.errors),
+            'stages': stages,
+            'import_seconds': round(total, 4),
+        }
@@ -0,0 +1,104 @@
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+
+from salaries.importer import SalaryImporter
+from salaries.models import SalaryStatement
+from salaries.readers import open_reader
+from salaries.serializers import SalaryStatementSerializer, StatementRowSerializer
+from salaries.synthetic import write_payroll_file
+
+
+class Command(BaseCommand):
+    help = (
+        'يقارن SalaryStatementSerializer بالمسار السريع StatementRowSerializer '
+        '(استعلام + تحويل + JSON) على مفردات وهمية، ويتأكد إن الـ bytes متطابقة. '
+        'البيانات بتترجع (rollback) في الآخر.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3, help='أحسن وقت من كام مرة')
+        parser.add_argument('--fields', default='', help='حقول مختارة مفصولة بفاصلة (الافتراضي كله)')
+        parser.add_argument('--output', default='', help='ملف JSON للنتايج (الافتراضي stdout)')
+
+    def handle(self, *args, **options):
+        fields = [f.strip() for f in options['fields'].split(',') if f.strip()] or None
+        available = list(SalaryStatementSerializer().fields)
+        unknown = [f for f in fields or () if f not in available]
+        if unknown:
+            raise CommandError(f'حقول غير معروفة: {", ".join(unknown)}')
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for count in options['rows']:
+                path = os.path.join(tmp, f'payroll_{count}.csv')
+                write_payroll_file(path, count, file_format='csv')
+                with transaction.atomic():
+                    self._load(path)
+                    results.append(self._measure(count, fields, options['repeat']))
+                    transaction.set_rollback(True)
+
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'fields': fields or available,
+            'results': results,
+        }
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                fh.write(data)
+            self.stdout.write(f"النتايج في {options['output']}")
+        else:
+            self.stdout.write(data)
+
+    def _load(self, path):
+        importer = SalaryImporter(date(2000, 1, 1))
+        with open_reader(path, 'csv') as reader:
+            importer.begin(reader.header)
+            for line, row in reader:
+                importer.feed(row, line)
+        importer.finish()
+
+    def _measure(self, count, fields, repeat):
+        queryset = SalaryStatement.objects.filter(month=date(2000, 1, 1)).order_by('-month', '-id')
+        renderer = JSONRenderer()
+
+        def drf():
+            return renderer.render(
+                SalaryStatementSerializer(queryset.select_related('user'), many=True, fields=fields).data
+            )
+
+        def fast():
+            serializer = StatementRowSerializer(fields=fields)
+            return renderer.render(serializer.data(serializer.rows(queryset)))
+
+        timings = {}
+        output = {}
+        for name, func in (('drf', drf), ('fast', fast)):
+            best = None
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                output[name] = func()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+
+        if output['drf'] != output['fast']:
+            raise CommandError(f'ناتج المسار السريع مختلف عن DRF ({count} صف)')
+        return {
+            'rows': count,
+            'bytes': len(output['drf']),
+            'drf_seconds': round(timings['drf'], 4),
+            'fast_seconds': round(timings['fast'], 4),
+            'speedup': round(timings['drf'] / timings['fast'], 2) if timings['fast'] else None,
+        }
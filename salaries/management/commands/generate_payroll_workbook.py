@@ -0,0 +1,26 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from salaries.synthetic import FORMATS, write_payroll_file
+
+
+class Command(BaseCommand):
+    help = 'يعمل شيتات مرتبات وهمية بنفس أعمدة الشيت الحقيقي (للقياس والاختبار).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='عدد الصفوف (ملف لكل رقم)')
+        parser.add_argument('--output-dir', default='.', help='مكان الملفات')
+        parser.add_argument('--format', choices=FORMATS, default='xlsx')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--invalid-rate', type=float, default=0.0,
+                            help='نسبة الصفوف اللي فيها قيمة غلط متعمّدة (0 - 1)')
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for count in options['rows']:
+            path = os.path.join(options['output_dir'], f"payroll_{count}.{options['format']}")
+            write_payroll_file(path, count, seed=options['seed'], invalid_rate=options['invalid_rate'],
+                               file_format=options['format'])
+            self.stdout.write(f'{path}: {count} صف')
@@ -0,0 +1,43 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from salaries.jobs import claim_job, default_worker_id, run_job
+
+
+class Command(BaseCommand):
+    help = 'يشغّل مهام رفع المرتبات من الطابور (ممكن أكتر من worker على أكتر من سيرفر).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='نفّذ المهام الموجودة حاليًا واخرج')
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='ثواني الانتظار لما الطابور يكون فاضي')
+        parser.add_argument('--worker-id', default='',
+                            help='اسم الـ worker (الافتراضي host:pid)')
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or default_worker_id()
+        self._stopping = False
+
+        def stop(signum, frame):
+            # نكمّل المهمة الحالية ونخرج
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(f'salary import worker {worker_id} started')
+        while not self._stopping:
+            close_old_connections()
+            job = claim_job(worker_id)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            self.stdout.write(f'job {job.id} ({job.file_name}) attempt {job.attempts}')
+            run_job(job)
+        self.stdout.write(f'salary import worker {worker_id} stopped')
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0002_salaryimportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0003_salaryimportjob_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='mode',
+            field=models.CharField(choices=[('replace', 'استبدال مفردات الشهر بالكامل'), ('diff', 'تحديث الصفوف المتغيرة فقط')], default='replace', max_length=10),
+        ),
+    ]
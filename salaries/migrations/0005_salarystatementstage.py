@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0004_salaryimportjob_mode'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalaryStatementStage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_salary', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('changed_salary', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('special_bonus', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('extra', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('rest_allowance', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('performance_evaluation', models.CharField(blank=True, max_length=255, null=True)),
+                ('special_incentive', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('meal_allowance', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('transport_allowance', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('total_entitlements', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('loan', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('insurance', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('absence', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('penalties', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quality_deduction_cash', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quality_deduction_days', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('installments', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('monthly_receipts', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('total_deductions', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('net_salary', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('notes', models.TextField(blank=True, default='', null=True)),
+                ('stage_key', models.UUIDField(db_index=True)),
+                ('month', models.DateField()),
+                ('statement_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0005_salarystatementstage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exceluploadlog',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='month',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
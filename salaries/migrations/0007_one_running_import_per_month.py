@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0006_upload_content_sha256'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='salaryimportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'running')), fields=('month',), name='one_running_salary_import_per_month'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0007_one_running_import_per_month'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='file_format',
+            field=models.CharField(choices=[('xlsx', 'Excel'), ('csv', 'CSV'), ('parquet', 'Parquet'), ('feather', 'Feather')], default='xlsx', max_length=10),
+        ),
+    ]
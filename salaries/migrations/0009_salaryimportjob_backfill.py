@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0008_salaryimportjob_file_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='backfill',
+            field=models.BooleanField(default=False),
+        ),
+    ]
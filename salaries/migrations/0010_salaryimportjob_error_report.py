@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0009_salaryimportjob_backfill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='error_report',
+            field=models.FileField(blank=True, upload_to='salary_import_errors/%Y/%m/'),
+        ),
+    ]
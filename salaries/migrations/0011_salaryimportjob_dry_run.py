@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0010_salaryimportjob_error_report'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='salaryimportjob',
+            name='one_running_salary_import_per_month',
+        ),
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='dry_run',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddConstraint(
+            model_name='salaryimportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('dry_run', False), ('status', 'running')), fields=('month',), name='one_running_salary_import_per_month'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0011_salaryimportjob_dry_run'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salarystatement',
+            index=models.Index(fields=['month', 'id'], name='salary_month_id_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0012_salarystatement_month_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salarystatement',
+            index=models.Index(fields=['user', 'month'], name='salary_user_month_idx'),
+        ),
+    ]
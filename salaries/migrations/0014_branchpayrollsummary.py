@@ -0,0 +1,56 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:52
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+
+SUMMARY_FIELDS = ('total_entitlements', 'total_deductions', 'net_salary')
+
+
+def fill_summaries(apps, schema_editor):
+    # كل الشهور الموجودة في تجميعة واحدة (مرة واحدة وقت الـ migrate)
+    SalaryStatement = apps.get_model('salaries', 'SalaryStatement')
+    BranchPayrollSummary = apps.get_model('salaries', 'BranchPayrollSummary')
+    rows = (
+        SalaryStatement.objects.annotate(branch=Coalesce('user__branch_name', Value('')))
+        .values('month', 'branch')
+        .annotate(employees=Count('id'), **{field: Sum(field) for field in SUMMARY_FIELDS})
+        .order_by()
+    )
+    BranchPayrollSummary.objects.bulk_create([
+        BranchPayrollSummary(
+            month=row['month'], branch_name=row['branch'], employees=row['employees'],
+            **{field: row[field] or 0 for field in SUMMARY_FIELDS},
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0013_salarystatement_user_month_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BranchPayrollSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('branch_name', models.CharField(blank=True, max_length=255)),
+                ('employees', models.PositiveIntegerField(default=0)),
+                ('total_entitlements', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_deductions', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('net_salary', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-month', 'branch_name'],
+                'constraints': [models.UniqueConstraint(fields=('month', 'branch_name'), name='one_summary_per_branch_month')],
+            },
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0014_branchpayrollsummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salarystatementstage',
+            name='employee_id',
+            field=models.CharField(default='', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='salarystatementstage',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
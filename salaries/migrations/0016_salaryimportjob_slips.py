@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0015_salarystatementstage_employee_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='branch_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='kind',
+            field=models.CharField(choices=[('import', 'رفع مفردات'), ('slips', 'كشوف PDF')], default='import', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='salaryimportjob',
+            name='output',
+            field=models.FileField(blank=True, upload_to='salary_slips/%Y/%m/'),
+        ),
+        migrations.AlterField(
+            model_name='salaryimportjob',
+            name='file',
+            field=models.FileField(blank=True, upload_to='salary_uploads/%Y/%m/'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0016_salaryimportjob_slips'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='salaryimportjob',
+            name='one_running_salary_import_per_month',
+        ),
+        migrations.AddConstraint(
+            model_name='salaryimportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('dry_run', False), ('kind', 'import'), ('status', 'running')), fields=('month',), name='one_running_salary_import_per_month'),
+        ),
+    ]
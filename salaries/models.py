@@ -1,10 +1,8 @@
 from django.db import models
 from accounts.models import CustomUser
 
-class SalaryStatement(models.Model):
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
-    month = models.DateField()
-
+class SalaryFields(models.Model):
+    """حقول مفردات الشهر (مشتركة بين SalaryStatement وجدول الـ staging)."""
     base_salary = models.DecimalField(max_digits=10, decimal_places=2)
     changed_salary = models.DecimalField(max_digits=10, decimal_places=2)
     special_bonus = models.DecimalField(max_digits=10, decimal_places=2)
@@ -28,19 +26,65 @@ class SalaryStatement(models.Model):
     net_salary = models.DecimalField(max_digits=10, decimal_places=2)
 
     notes = models.TextField(blank=True, null=True, default="")
+
+    class Meta:
+        abstract = True
+
+
+class SalaryStatement(SalaryFields):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    month = models.DateField()
+
     updated_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='updated_salaries')
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination على (month, id)
+            models.Index(fields=['month', 'id'], name='salary_month_id_idx'),
+            # آخر مفردات للموظف (my-slip) و تاريخه
+            models.Index(fields=['user', 'month'], name='salary_user_month_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        if 'notes' in kwargs.get('update_fields', []) or kwargs.get('force_insert', False):
+        update_fields = kwargs.get('update_fields')
+        if 'notes' in (update_fields or []) or kwargs.get('force_insert', False):
             if hasattr(self, '_current_user'):
                 self.updated_by = self._current_user
+                if update_fields is not None:
+                    update_fields = [*update_fields, 'updated_by']
+        if update_fields is not None:
+            # auto_now مش بيتكتب لو مش في update_fields؛ ETag/Last-Modified وكاش الـ PDF معتمدين عليه
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} - {self.month.strftime('%B %Y')}"
 
 
+class BranchPayrollSummary(models.Model):
+    """
+    إجماليات كل فرع في كل شهر، محسوبة مرة واحدة وقت نشر الاستيراد (salaries.summaries)
+    بدل تجميع جدول المفردات كله مع كل طلب. الفرع هو فرع الموظف وقت الاستيراد.
+    """
+    month = models.DateField()
+    branch_name = models.CharField(max_length=255, blank=True)
+    employees = models.PositiveIntegerField(default=0)
+    total_entitlements = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_deductions = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    net_salary = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-month', 'branch_name']
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'branch_name'], name='one_summary_per_branch_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.branch_name or '-'} - {self.month.strftime('%B %Y')}"
+
+
 from django.db import models
 from django.contrib.auth import get_user_model
 
@@ -52,6 +96,121 @@ class ExcelUploadLog(models.Model):
     file_name = models.CharField(max_length=255)
     sheet_name = models.CharField(max_length=255, blank=True, null=True)
     month = models.DateField(null=True, blank=True) 
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
 
     def __str__(self):
         return f"{self.file_name} uploaded by {self.uploader} at {self.upload_time.strftime('%Y-%m-%d %H:%M')}"
+
+
+import uuid
+from django.utils import timezone
+
+
+class ImportJobStatus(models.TextChoices):
+    QUEUED = 'queued', 'في الانتظار'
+    RUNNING = 'running', 'جاري التنفيذ'
+    DONE = 'done', 'تم'
+    ERROR = 'error', 'فشل'
+
+
+class ImportMode(models.TextChoices):
+    REPLACE = 'replace', 'استبدال مفردات الشهر بالكامل'
+    DIFF = 'diff', 'تحديث الصفوف المتغيرة فقط'
+
+
+class JobKind(models.TextChoices):
+    IMPORT = 'import', 'رفع مفردات'
+    SLIPS = 'slips', 'كشوف PDF'
+
+
+class ImportFormat(models.TextChoices):
+    XLSX = 'xlsx', 'Excel'
+    CSV = 'csv', 'CSV'
+    PARQUET = 'parquet', 'Parquet'
+    FEATHER = 'feather', 'Feather'
+
+
+class SalaryImportJob(models.Model):
+    """
+    مهمة في طابور بقاعدة البيانات (يشتغل عليها salary_import_worker):
+    رفع مفردات، أو تجميع كشوف شهر/فرع في PDF واحد (kind=slips).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=10, choices=JobKind.choices, default=JobKind.IMPORT)
+    uploader = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # الملف على الـ storage المشترك عشان أي worker يقدر يقراه (مهمة الكشوف مالهاش ملف)
+    file = models.FileField(upload_to='salary_uploads/%Y/%m/', blank=True)
+    file_name = models.CharField(max_length=255)
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    month = models.DateField(null=True, blank=True)  # فاضي في backfill (الشهر من عمود في الشيت)
+    backfill = models.BooleanField(default=False)
+    # معاينة: قراءة + تحقق + مقارنة بالموجود من غير أي كتابة في المفردات أو الموظفين
+    dry_run = models.BooleanField(default=False)
+    mode = models.CharField(max_length=10, choices=ImportMode.choices, default=ImportMode.REPLACE)
+    # بيتحدد من أول bytes في الملف وقت الرفع (مش من الامتداد)
+    file_format = models.CharField(max_length=10, choices=ImportFormat.choices, default=ImportFormat.XLSX)
+
+    status = models.CharField(max_length=10, choices=ImportJobStatus.choices,
+                              default=ImportJobStatus.QUEUED, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    # التقدّم نفسه على صف المهمة عشان أي process (web أو worker) يشوفه
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    progress = models.JSONField(default=dict, blank=True)  # rate + إحصائيات النهاية
+    # الصفوف المرفوضة (رقم الصف، الموظف، العمود، السبب) كملف xlsx للتحميل
+    error_report = models.FileField(upload_to='salary_import_errors/%Y/%m/', blank=True)
+    # مهمة الكشوف: الفرع (فاضي = كل الفروع) وملف الـ PDF الناتج
+    branch_name = models.CharField(max_length=255, blank=True)
+    output = models.FileField(upload_to='salary_slips/%Y/%m/', blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        constraints = [
+            # مهمة رفع واحدة بس شغالة لكل شهر؛ التانية تستنى في الطابور
+            # (المعاينة ومهام الكشوف مش بتكتب فمستثناة)
+            models.UniqueConstraint(
+                fields=['month'], condition=models.Q(status='running', dry_run=False, kind='import'),
+                name='one_running_salary_import_per_month',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.file_name} [{self.status}]"
+
+    @property
+    def percent(self):
+        if self.status == ImportJobStatus.DONE:
+            return 100
+        return min(int(self.processed * 100 / self.total), 99) if self.total else 0
+
+    def progress_state(self):
+        state = dict(self.progress)
+        state.update(status=self.status, processed=self.processed,
+                     total=self.total, percent=self.percent)
+        if self.error:
+            state['error'] = self.error
+        return state
+
+
+class SalaryStatementStage(SalaryFields):
+    """
+    جدول staging للاستيراد: الصفوف بتتحمّل هنا الأول، وبعدين تتنشر على SalaryStatement
+    في transaction واحدة قصيرة، فاللي بيقرا يشوف الشهر القديم أو الجديد كامل.
+    """
+    stage_key = models.UUIDField(db_index=True)
+    # الموظف الجديد مالوش user لسه: بيتعمل وقت النشر ويتربط بـ employee_id
+    employee_id = models.CharField(max_length=20, default='')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+', null=True, blank=True)
+    month = models.DateField()
+    # وضع diff: رقم المفردات الموجودة اللي الصف ده هيحدّثها (فاضي = insert)
+    statement_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
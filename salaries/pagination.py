@@ -0,0 +1,104 @@
+"""
+Keyset (cursor) pagination على (month, id) تنازلي بدل OFFSET + COUNT:
+كل صفحة استعلام واحد بـ WHERE month <= m AND (month < m OR month = m AND id < آخر id) + LIMIT، فالصفحة 500 زي الأولى.
+شرط month <= m لوحده هو اللي بيخلي الـ index على (month, id) يبدأ من الـ cursor بدل ما يفلتر من الأول.
+"""
+import base64
+import json
+from datetime import date
+
+from django.db import connections
+from django.db.models import Q
+
+
+def object_key(obj):
+    return obj.month, obj.pk
+
+
+def encode_cursor(obj, key=object_key):
+    month, pk = key(obj)
+    raw = f'{month.isoformat()}:{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """يرجّع (month, id) أو None لو الـ cursor بايظ."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        month, pk = raw.split(':')
+        return date.fromisoformat(month), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, estimated_count=None, key=object_key):
+        self.object_list = object_list
+        self.key = key
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.estimated_count = estimated_count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.object_list[-1], self.key) if self.has_next else ''
+
+    @property
+    def previous_cursor(self):
+        return encode_cursor(self.object_list[0], self.key) if self.has_previous else ''
+
+
+def keyset_page(queryset, after=None, before=None, per_page=15, estimate=False, key=object_key):
+    """
+    صفحة من queryset مترتبة (month, id) تنازلي.
+    after: cursor آخر صف في الصفحة اللي فاتت (الصفحة الجاية)، before: أول صف (الصفحة اللي قبلها).
+    key: بيطلع (month, id) من الصف (للـ values_list مثلًا).
+    """
+    estimated_count = estimated_rows(queryset) if estimate else None
+    cursor = decode_cursor(before) if before else None
+    if cursor:
+        month, pk = cursor
+        rows = list(
+            queryset.filter(Q(month__gt=month) | Q(month=month, pk__gt=pk), month__gte=month)
+            .order_by('month', 'id')[:per_page + 1]
+        )
+        if rows:
+            has_previous = len(rows) > per_page
+            return KeysetPage(rows[:per_page][::-1], has_next=True, has_previous=has_previous,
+                              estimated_count=estimated_count, key=key)
+        # مفيش صفوف أحدث من الـ cursor (اتمسحت مثلًا): الصفحة الأولى بدل صفحة فاضية
+        after = None
+
+    cursor = decode_cursor(after) if after else None
+    if cursor:
+        month, pk = cursor
+        queryset = queryset.filter(Q(month__lt=month) | Q(month=month, pk__lt=pk), month__lte=month)
+    rows = list(queryset.order_by('-month', '-id')[:per_page + 1])
+    return KeysetPage(rows[:per_page], has_next=len(rows) > per_page, has_previous=bool(cursor),
+                      estimated_count=estimated_count, key=key)
+
+
+def estimated_rows(queryset):
+    """
+    عدد تقريبي من تقدير الـ planner على PostgreSQL (EXPLAIN من غير تنفيذ) بدل COUNT(*) كامل.
+    القواعد التانية بترجّع None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,48 @@
+"""
+تحويل HTML كشف المرتب لـ PDF بـ xhtml2pdf (فوق reportlab).
+الموديول ده بيشتغل في processes من غير django.setup() (الـ batch بالتوازي)، فمفيش Django هنا.
+reportlab مابيشكّلش الحروف العربي: كل نص عربي بيتوصّل (arabic_reshaper)
+ويتقلب لترتيب العرض (python-bidi) قبل التحويل.
+"""
+import io
+import re
+from html import escape, unescape
+
+from arabic_reshaper import reshape
+from bidi.algorithm import get_display
+from pypdf import PdfWriter
+from xhtml2pdf import pisa
+
+_ARABIC_RE = re.compile('[\u0600-\u06ff]')
+# النص اللي بين التاجات
+_TEXT_RE = re.compile(r'>([^<]+)<')
+
+
+def _visual(match):
+    text = unescape(match.group(1))
+    if not _ARABIC_RE.search(text):
+        return match.group(0)
+    return '>' + escape(get_display(reshape(text)), quote=False) + '<'
+
+
+def visual_order(html):
+    """يحوّل كل النصوص العربي في الـ HTML لحروف متشكّلة بترتيب العرض (من الشمال لليمين)."""
+    return _TEXT_RE.sub(_visual, html)
+
+
+def render_pdf(html):
+    """HTML -> bytes ملف PDF."""
+    out = io.BytesIO()
+    result = pisa.CreatePDF(visual_order(html), dest=out, encoding='utf-8')
+    if result.err:
+        raise ValueError(f'فشل تحويل كشف المرتب لـ PDF ({result.err} خطأ)')
+    return out.getvalue()
+
+
+def merge_pdfs(paths, dest):
+    """يجمع ملفات PDF بالترتيب في ملف واحد (dest: مسار أو file object)."""
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    writer.write(dest)
+    writer.close()
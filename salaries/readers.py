@@ -0,0 +1,274 @@
+"""
+قراءة ملفات المرتبات صف بصف (streaming) بذاكرة ثابتة مهما كان طول الملف.
+كل القرّاء (XLSX / CSV / Parquet / Feather) ليهم نفس الشكل:
+header + التكرار بيرجّع (رقم الصف في الملف, tuple نصوص بطول الهيدر) + total تقريبي.
+رقم الصف فعلي (الصفوف الفاضية اللي بتتساب بتتحسب) عشان تقرير الأخطاء يشاور على الصف الصح.
+"""
+import codecs
+import csv
+import re
+from datetime import date, datetime
+
+import numpy as np
+from openpyxl import load_workbook
+
+from .coercion import CANONICAL_INDEX, coerce_rows, resolve_columns, to_canonical
+
+PARSE_CHUNK = 2000
+SNIFF_SIZE = 64 * 1024
+
+# قيم ImportFormat كنصوص: الموديول ده بيتعمله import في processes من غير django.setup()
+XLSX, CSV, PARQUET, FEATHER = 'xlsx', 'csv', 'parquet', 'feather'
+
+# أول bytes في الملف -> الصيغة (xlsx = zip)
+_MAGIC = (
+    (b'PK\x03\x04', XLSX),
+    (b'PAR1', PARQUET),
+    (b'ARROW1', FEATHER),
+)
+# تصدير إكسل العربي على ويندوز بيطلع CSV بـ cp1256 لو مش UTF-8
+CSV_ENCODINGS = ('utf-8-sig', 'cp1256')
+CSV_DELIMITERS = ',;\t|'
+
+
+def cell_text(value):
+    """يحوّل قيمة الخلية لنص بنفس شكل pd.read_excel(dtype=str) تقريبًا."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+_ROW_TAG = re.compile(rb'<(?:\w+:)?row[\s>]')
+
+
+def _count_xml_rows(sheet):
+    """عدد تاجات <row> في XML الشيت (قراءة bytes من غير parsing)."""
+    count, tail = 0, b''
+    with sheet._get_source() as source:
+        for chunk in iter(lambda: source.read(1 << 20), b''):
+            data = tail + chunk
+            count += len(_ROW_TAG.findall(data))
+            # التاج ممكن يتقطع بين دفعتين: آخر bytes بتتقرا تاني من غير ما تتعد مرتين
+            cut = max(data.rfind(b'<'), len(data) - 16)
+            count -= len(_ROW_TAG.findall(data[cut:]))
+            tail = data[cut:]
+    return count + len(_ROW_TAG.findall(tail))
+
+
+class XlsxSheetReader:
+    """
+    يقرأ شيت XLSX بوضع read_only: الهيدر في self.header،
+    والتكرار على الكائن يرجّع (رقم الصف في الشيت, tuple نصوص بطول الهيدر).
+    """
+
+    def __init__(self, path, sheet_name=None):
+        self.workbook = load_workbook(path, read_only=True, data_only=True)
+        self.sheet = self.workbook[sheet_name] if sheet_name else self.workbook.worksheets[0]
+        self.sheet_name = self.sheet.title
+        self._rows = self.sheet.iter_rows(values_only=True)
+        first = next(self._rows, None) or ()
+        self.header = tuple(cell_text(v).strip() for v in first)
+        # max_row من أبعاد الشيت المسجّلة (تقريبية لو فيه صفوف فاضية في الآخر)؛
+        # ملفات write_only (زي تصدير النظام) مش بتسجّل أبعاد فبنعد تاجات الصفوف
+        max_row = self.sheet.max_row
+        if max_row is None:
+            max_row = _count_xml_rows(self.sheet)
+        self.total = max(max_row - 1, 0)
+
+    def __iter__(self):
+        width = len(self.header)
+        for line, values in enumerate(self._rows, start=2):
+            row = tuple(cell_text(v) for v in values[:width])
+            if not any(row):
+                continue
+            if len(row) < width:
+                row += ('',) * (width - len(row))
+            yield line, row
+
+    def close(self):
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _csv_encoding(sample):
+    for encoding in CSV_ENCODINGS:
+        try:
+            # final=False: العينة ممكن تقطع حرف عربي من النص
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def detect_format(file):
+    """
+    يحدد صيغة الملف من محتواه (file object بيدعم read/seek) ويرجّع قيمة ImportFormat أو None.
+    أي ملف نصي من غير NUL بيتعامل كـ CSV.
+    """
+    file.seek(0)
+    sample = file.read(SNIFF_SIZE)
+    file.seek(0)
+    for magic, fmt in _MAGIC:
+        if sample.startswith(magic):
+            return fmt
+    if sample and b'\x00' not in sample and _csv_encoding(sample):
+        return CSV
+    return None
+
+
+class CsvReader:
+    """CSV بالـ csv module (أسرع بكتير من XML بتاع xlsx)؛ الترميز والفاصل بيتعرفوا من أول الملف."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as fh:
+            sample = fh.read(SNIFF_SIZE)
+            # عدد السطور تقريبي (خلية فيها سطر جديد بتتحسب مرتين)
+            lines = sample.count(b'\n') + sum(chunk.count(b'\n') for chunk in iter(lambda: fh.read(1 << 20), b''))
+        encoding = _csv_encoding(sample) or CSV_ENCODINGS[0]
+        self.file = open(path, newline='', encoding=encoding, errors='replace')
+        first_line = self.file.readline()
+        try:
+            dialect = csv.Sniffer().sniff(first_line, delimiters=CSV_DELIMITERS)
+            delimiter = dialect.delimiter
+        except csv.Error:
+            delimiter = ','
+        self.file.seek(0)
+        self._rows = csv.reader(self.file, delimiter=delimiter)
+        self.header = tuple(v.strip() for v in next(self._rows, ()))
+        self.sheet_name = ''
+        self.total = max(lines - 1, 0)
+
+    def __iter__(self):
+        width = len(self.header)
+        end = self._rows.line_num
+        for values in self._rows:
+            # رقم أول سطر في الصف (الخلية اللي فيها سطر جديد بتاخد أكتر من سطر)
+            line, end = end + 1, self._rows.line_num
+            row = tuple(values[:width])
+            if not any(row):
+                continue
+            if len(row) < width:
+                row += ('',) * (width - len(row))
+            yield line, row
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArrowReader:
+    """
+    Parquet / Feather (Arrow IPC) بـ pyarrow: الملف بيتقرا record batch ورا التانية،
+    وكل batch بيتحول لنصوص عمود عمود.
+    """
+
+    def __init__(self, path, file_format):
+        import pyarrow as pa
+
+        if file_format == PARQUET:
+            import pyarrow.parquet as pq
+
+            self._source = pq.ParquetFile(path)
+            schema = self._source.schema_arrow
+            self.total = self._source.metadata.num_rows
+            self._batches = self._source.iter_batches(batch_size=PARSE_CHUNK)
+        else:
+            # memory map: الـ batches بتتقرا من غير نسخ
+            self._source = pa.ipc.open_file(pa.memory_map(path))
+            schema = self._source.schema
+            batches = [self._source.get_batch(i) for i in range(self._source.num_record_batches)]
+            self.total = sum(batch.num_rows for batch in batches)
+            self._batches = iter(batches)
+        self.header = tuple(str(name).strip() for name in schema.names)
+        self.sheet_name = ''
+
+    def __iter__(self):
+        line = 2  # زي الشيت: الصف 1 هو الهيدر
+        for batch in self._batches:
+            columns = [[cell_text(v) for v in column.to_pylist()] for column in batch.columns]
+            for offset, row in enumerate(zip(*columns)):
+                if any(row):
+                    yield line + offset, row
+            line += batch.num_rows
+
+    def close(self):
+        close = getattr(self._source, 'close', None)
+        if close:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_reader(path, file_format=XLSX, sheet_name=None):
+    """القارئ المناسب للصيغة (XLSX: sheet_name أو أول شيت)."""
+    if file_format == CSV:
+        return CsvReader(path)
+    if file_format in (PARQUET, FEATHER):
+        return ArrowReader(path, file_format)
+    return XlsxSheetReader(path, sheet_name)
+
+
+def _has_data(sheet):
+    """هيدر + صف واحد على الأقل مش فاضي (بيقف عند أول صف بيانات)."""
+    rows = sheet.iter_rows(values_only=True)
+    header = next(rows, None) or ()
+    if not any(cell_text(v).strip() for v in header):
+        return False
+    return any(any(cell_text(v) for v in row) for row in rows)
+
+
+def data_sheet_names(path):
+    """أسماء الشيتات اللي فيها بيانات بس (شيت فاضي زي Sheet2 ما يتحسبش)."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return [sheet.title for sheet in workbook.worksheets if _has_data(sheet)]
+    finally:
+        workbook.close()
+
+
+def parse_sheet(path, sheet_name):
+    """
+    بيشتغل في process منفصلة (ProcessPoolExecutor): يقرا شيت واحد ويتحقق منه.
+    يرجّع (الصفوف السليمة (رقم الصف, صف بالترتيب الموحّد CANONICAL_COLUMNS), أخطاء الصفوف المرفوضة).
+    الشيت اللي مالوش عمود فرع بياخد اسم الشيت كاسم الفرع (ملف فيه أكتر من شيت بيانات بس).
+    """
+    with XlsxSheetReader(path, sheet_name) as sheet:
+        if not any(sheet.header):
+            return [], []
+        try:
+            index = resolve_columns(sheet.header)
+        except KeyError as e:
+            raise KeyError(f'{e.args[0]} (شيت {sheet_name})') from None
+        rows = [(line, to_canonical(row, index, branch=sheet_name)) for line, row in sheet]
+
+    valid, errors = [], []
+    for start in range(0, len(rows), PARSE_CHUNK):
+        chunk = rows[start:start + PARSE_CHUNK]
+        batch = coerce_rows(CANONICAL_INDEX, [row for _, row in chunk])
+        errors += [
+            (chunk[pos][0], batch.text['employee_id'][pos], f'{sheet_name}: {column}', reason)
+            for pos, column, reason in batch.errors
+        ]
+        valid += [chunk[pos] for pos in np.flatnonzero(~batch.invalid)]
+    return valid, errors
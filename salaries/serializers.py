@@ -1,5 +1,15 @@
+from decimal import Decimal, getcontext
+
 from rest_framework import serializers
-from .models import SalaryStatement
+from .models import SalaryFields, SalaryStatement
+
+# حقول الموظف في الرد -> أعمدة جدول الموظف اللي محتاجاها
+USER_FIELD_COLUMNS = {
+    'user_full_name': ('user__first_name', 'user__last_name'),
+    'user_username': ('user__username',),
+    'user_is_active': ('user__is_active',),
+}
+
 
 class SalaryStatementSerializer(serializers.ModelSerializer):
     user_full_name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -7,4 +17,80 @@ class SalaryStatementSerializer(serializers.ModelSerializer):
     user_is_active = serializers.BooleanField(source='user.is_active', read_only=True)
     class Meta:
         model = SalaryStatement
-        exclude = ['user']
+        # ترتيب ثابت للمفاتيح (month قبل المبالغ زي ما كان قبل SalaryFields)
+        fields = [
+            'id', 'user_full_name', 'user_username', 'user_is_active', 'month',
+            *(f.name for f in SalaryFields._meta.fields), 'updated_at', 'updated_by',
+        ]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        # fields: أسماء الحقول المطلوبة بس (sparse fieldset)؛ None = كله
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class StatementRowSerializer:
+    """
+    مسار سريع لنفس ناتج SalaryStatementSerializer (نفس المفاتيح والترتيب والقيم بالظبط):
+    الاستعلام بـ values_list والتحويل بدوال متجهّزة مرة واحدة لكل حقل بدل ماكينة DRF صف صف.
+    """
+
+    def __init__(self, fields=None):
+        serializer = SalaryStatementSerializer(fields=fields)
+        self.columns = ['id', 'month']
+        self.converters = []
+        for name, field in serializer.fields.items():
+            self.converters.append((name, self._converter(name, field)))
+
+    def _column(self, name):
+        if name not in self.columns:
+            self.columns.append(name)
+        return self.columns.index(name)
+
+    def _converter(self, name, field):
+        if name == 'user_full_name':
+            first, last = self._column('user__first_name'), self._column('user__last_name')
+            return lambda row: f'{row[first]} {row[last]}'.strip()
+        if name in USER_FIELD_COLUMNS:
+            i = self._column(USER_FIELD_COLUMNS[name][0])
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            i = self._column(SalaryStatement._meta.get_field(name).attname)
+        else:
+            i = self._column(name)
+
+        if isinstance(field, serializers.DecimalField):
+            # نفس DecimalField.quantize + '{:f}' في DRF
+            exponent = Decimal('.1') ** field.decimal_places
+            context = getcontext().copy()
+            context.prec = field.max_digits
+            rounding = field.rounding
+
+            def convert(row):
+                value = row[i]
+                if value is None:
+                    return None
+                if not isinstance(value, Decimal):
+                    value = Decimal(str(value).strip())
+                return '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+            return convert
+        if isinstance(field, (serializers.IntegerField, serializers.PrimaryKeyRelatedField)):
+            return lambda row: row[i]
+        if type(field) is serializers.CharField:
+            return lambda row: None if row[i] is None else str(row[i])
+        # تاريخ/وقت/bool: دالة الحقل نفسها (صيغ DATE_FORMAT/DATETIME_FORMAT والـ timezone)
+        to_representation = field.to_representation
+        return lambda row: None if row[i] is None else to_representation(row[i])
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    @staticmethod
+    def key(row):
+        """(month, id) للـ keyset cursor."""
+        return row[1], row[0]
+
+    def data(self, rows):
+        converters = self.converters
+        return [{name: convert(row) for name, convert in converters} for row in rows]
@@ -0,0 +1,145 @@
+"""
+كشوف المرتبات PDF: كشف واحد أو كل كشوف فرع/شهر في ملف واحد.
+كل كشف بيتحفظ على الديسك باسم فيه نسخته (updated_at + الملاحظات + بيانات الموظف اللي في الكشف)،
+فالتحميل التاني بيتقرا من الديسك من غير تحويل؛ والـ batch بيحوّل الناقص بس في processes بالتوازي.
+الـ batch الكبير بيشتغل كمهمة في طابور الرفع (jobs) مش جوه طلب الويب.
+"""
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from .models import SalaryStatement
+from .pdf import merge_pdfs, render_pdf
+
+SLIP_TEMPLATE = 'salaries/salary_slip_pdf.html'
+# غيّرها لما شكل القالب يتغير عشان النسخ القديمة من الكاش ماتتستخدمش
+TEMPLATE_VERSION = 1
+# أكتر من كده بيتعمل كمهمة في الطابور (~0.2 ثانية تحويل للكشف الواحد)
+SLIP_SYNC_LIMIT = 25
+# ملف .tmp أقدم من كده يبقى كتابة وقفت في النص (process مات)
+STALE_TMP_SECONDS = 24 * 60 * 60
+
+
+def month_slips(month, branch=''):
+    """كشوف شهر (وفرع لو محدد) بترتيب الطباعة."""
+    statements = SalaryStatement.objects.filter(month=month)
+    if branch:
+        statements = statements.filter(user__branch_name=branch)
+    return statements.select_related('user').order_by('user__branch_name', 'user__employee_id', 'id')
+
+
+def slips_filename(month, branch=''):
+    return f'slips-{month:%Y-%m}{"-" + branch if branch else ""}.pdf'
+
+
+def slip_version(slip):
+    user = slip.user
+    # الملاحظات في البصمة كمان: أي تعديل عليها بيتعرض في الكشف حتى لو updated_at ما اتغيرش
+    version = (f'{TEMPLATE_VERSION}:{slip.updated_at.isoformat()}:{slip.notes or ""}:'
+               f'{user.get_full_name()}:{user.employee_id}:{user.branch_name}')
+    return hashlib.blake2b(version.encode(), digest_size=8).hexdigest()
+
+
+def cache_path(slip):
+    return os.path.join(settings.SLIP_PDF_CACHE_DIR, f'{slip.pk}-{slip_version(slip)}.pdf')
+
+
+def slip_html(slip):
+    font = settings.SLIP_PDF_FONT
+    return render_to_string(SLIP_TEMPLATE, {
+        'slip': slip,
+        'font_path': font if font and os.path.exists(font) else '',
+    })
+
+
+def _store(slip, data):
+    """يكتب الكشف في الكاش (rename ذرّي) ويمسح النسخ القديمة لنفس الكشف."""
+    path = cache_path(slip)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for old in glob(os.path.join(os.path.dirname(path), f'{slip.pk}-*.pdf')):
+        if old != path:
+            os.remove(old)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def purge_slip_cache(chunk_size=2000):
+    """
+    يمسح من الكاش كشوف مابقتش موجودة في القاعدة: الرفع بـ replace بيمسح مفردات الشهر
+    ويعملها بـ pk جديد، و_store بيمسح النسخ القديمة لنفس الـ pk بس. يرجّع عدد الملفات اللي اتمسحت.
+    """
+    directory = settings.SLIP_PDF_CACHE_DIR
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    files, stale = {}, []
+    for name in names:
+        pk, sep, _ = name.partition('-')
+        if sep and pk.isdigit() and name.endswith('.pdf'):
+            files.setdefault(int(pk), []).append(name)
+        elif name.endswith('.tmp'):
+            stale.append(name)
+    pks = list(files)
+    for i in range(0, len(pks), chunk_size):
+        for pk in SalaryStatement.objects.filter(pk__in=pks[i:i + chunk_size]).values_list('pk', flat=True):
+            del files[pk]
+
+    removed = 0
+    cutoff = time.time() - STALE_TMP_SECONDS
+    for name in [name for group in files.values() for name in group] + stale:
+        path = os.path.join(directory, name)
+        try:
+            if name.endswith('.tmp') and os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+        except FileNotFoundError:
+            continue  # worker تاني مسحه
+        removed += 1
+    return removed
+
+
+def slip_pdf(slip):
+    """مسار PDF الكشف (من الكاش لو موجود)؛ slip محتاج select_related('user')."""
+    path = cache_path(slip)
+    if os.path.exists(path):
+        return path
+    return _store(slip, render_pdf(slip_html(slip)))
+
+
+def batch_pdf(slips, dest, workers=None, on_progress=None):
+    """
+    يجمع كشوف كتير في PDF واحد (صفحة لكل كشف) في dest بالترتيب.
+    الكشوف اللي مش في الكاش بتتحوّل في processes منفصلة (reportlab CPU-bound)؛
+    workers=1 في نفس الـ process. on_progress(عدد) بعد كل كشف جاهز. يرجّع عدد اللي اتحوّل.
+    """
+    slips = list(slips)
+    missing = [slip for slip in slips if not os.path.exists(cache_path(slip))]
+    if on_progress and len(slips) > len(missing):
+        on_progress(len(slips) - len(missing))
+    workers = min(len(missing), workers or os.cpu_count() or 1)
+    if workers > 1:
+        pages = [slip_html(slip) for slip in missing]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+            chunksize = max(1, len(pages) // (workers * 4))
+            for slip, data in zip(missing, pool.map(render_pdf, pages, chunksize=chunksize)):
+                _store(slip, data)
+                if on_progress:
+                    on_progress(1)
+    else:
+        for slip in missing:
+            _store(slip, render_pdf(slip_html(slip)))
+            if on_progress:
+                on_progress(1)
+    merge_pdfs([cache_path(slip) for slip in slips], dest)
+    return len(missing)
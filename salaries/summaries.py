@@ -0,0 +1,47 @@
+"""
+جدول إجماليات الفروع (BranchPayrollSummary): بيتحسب للشهر اللي اتنشر جوه نفس transaction النشر،
+فالداشبورد بيقرا صف لكل فرع من الـ index (month, branch_name) مهما كان طول التاريخ.
+"""
+from django.db import transaction
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import BranchPayrollSummary, SalaryStatement
+
+SUMMARY_FIELDS = ('total_entitlements', 'total_deductions', 'net_salary')
+
+
+def branch_totals(statements):
+    """تجميع مفردات (queryset) لكل فرع: [{'branch', 'employees', إجماليات...}]."""
+    return (
+        statements.annotate(branch=Coalesce('user__branch_name', Value('')))
+        .values('branch')
+        .annotate(employees=Count('id'), **{field: Sum(field) for field in SUMMARY_FIELDS})
+        .order_by()
+    )
+
+
+def refresh_branch_summary(month):
+    """يعيد حساب إجماليات فروع الشهر من SalaryStatement (الشهر اللي مالوش مفردات بيتمسح)."""
+    rows = branch_totals(SalaryStatement.objects.filter(month=month))
+    with transaction.atomic():
+        BranchPayrollSummary.objects.filter(month=month).delete()
+        BranchPayrollSummary.objects.bulk_create([
+            BranchPayrollSummary(
+                month=month, branch_name=row['branch'], employees=row['employees'],
+                **{field: row[field] or 0 for field in SUMMARY_FIELDS},
+            )
+            for row in rows
+        ])
+
+
+def latest_summary_month():
+    return BranchPayrollSummary.objects.order_by('-month').values_list('month', flat=True).first()
+
+
+def month_summary(month):
+    """صفوف فروع الشهر + إجمالي الشركة (من صفوف الفروع نفسها، مش من المفردات)."""
+    branches = list(BranchPayrollSummary.objects.filter(month=month).order_by('branch_name'))
+    totals = {field: sum((getattr(b, field) for b in branches), 0) for field in SUMMARY_FIELDS}
+    totals['employees'] = sum(b.employees for b in branches)
+    return branches, totals
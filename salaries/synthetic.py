@@ -0,0 +1,120 @@
+"""
+شيتات مرتبات وهمية بنفس أعمدة الشيت الحقيقي (للقياس والاختبار):
+أسماء وفروع عربي، أرقام حسابات "متسخة" (مسافات، علامات اتجاه، أرقام عربية)،
+ومبالغ ساعات بفواصل آلاف أو أرقام عربية زي اللي بيطلع من إكسل فعلًا.
+"""
+import csv
+import random
+
+from openpyxl import Workbook
+
+from .coercion import (
+    BANK_COLUMNS, BRANCH_COLUMNS, EMPLOYEE_ID_COLUMN, NAME_COLUMN, NOTES_COLUMN, STATEMENT_COLUMNS,
+)
+
+HEADER = (
+    (EMPLOYEE_ID_COLUMN, NAME_COLUMN, BRANCH_COLUMNS[0], BANK_COLUMNS[0])
+    + tuple(STATEMENT_COLUMNS.values()) + (NOTES_COLUMN,)
+)
+FORMATS = ('xlsx', 'csv')
+
+FIRST_NAMES = ('محمد', 'أحمد', 'محمود', 'مصطفى', 'علي', 'عمر', 'يوسف', 'إبراهيم', 'خالد', 'حسن',
+               'فاطمة', 'مريم', 'آية', 'نور', 'سارة', 'هدى', 'منى', 'ياسمين', 'رحاب', 'دعاء')
+LAST_NAMES = ('عبد الباسط', 'السيد', 'عبد الله', 'حسين', 'إسماعيل', 'عبد الرحمن', 'سليمان', 'فتحي',
+              'الشافعي', 'منصور', 'رمضان', 'عبد العزيز', 'صالح', 'زكي', 'شعبان')
+BRANCHES = ('القاهرة', 'الجيزة', 'الإسكندرية', 'المنصورة', 'طنطا', 'أسيوط', 'الزقازيق', 'بورسعيد')
+EVALUATIONS = ('ممتاز', 'جيد جدًا', 'جيد', 'مقبول')
+NOTES = ('', '', '', 'تحت الاختبار', 'إجازة بدون مرتب', 'منقول من فرع آخر')
+
+ENTITLEMENTS = ('base_salary', 'changed_salary', 'special_bonus', 'extra', 'rest_allowance',
+                'special_incentive', 'meal_allowance', 'transport_allowance')
+DEDUCTIONS = ('loan', 'insurance', 'absence', 'penalties', 'quality_deduction_cash', 'installments',
+              'monthly_receipts')
+
+_ARABIC_DIGITS = str.maketrans('0123456789', '٠١٢٣٤٥٦٧٨٩')
+
+
+def _dirty_amount(value, rng):
+    """المبلغ زي ما بيجي من الشيتات: رقم، نص بفواصل آلاف، أو أرقام عربية."""
+    roll = rng.random()
+    if roll < 0.6:
+        return value
+    text = f'{value:,}' if roll < 0.8 else str(value)
+    if roll > 0.7:
+        text = text.translate(_ARABIC_DIGITS)
+    return text
+
+
+def _dirty_bank(rng):
+    digits = ''.join(rng.choice('0123456789') for _ in range(14))
+    roll = rng.random()
+    if roll < 0.4:
+        return digits
+    if roll < 0.6:
+        return ' '.join(digits[i:i + 4] for i in range(0, len(digits), 4))
+    if roll < 0.8:
+        return '\u200f' + digits.translate(_ARABIC_DIGITS) + '\u00a0'
+    return f'{digits[:4]}\u00a0{digits[4:]}'
+
+
+def payroll_rows(count, seed=0, invalid_rate=0.0, first_id=10000):
+    """صفوف بترتيب HEADER؛ invalid_rate نسبة الصفوف اللي فيها قيمة غلط متعمّدة."""
+    rng = random.Random(seed)
+    for i in range(count):
+        amounts = {field: 0 for field in STATEMENT_COLUMNS if field != 'performance_evaluation'}
+        amounts['base_salary'] = rng.randrange(3000, 25000, 50)
+        amounts['changed_salary'] = rng.randrange(0, 5000, 10)
+        amounts['special_bonus'] = rng.choice((0, 0, 250, 500))
+        amounts['extra'] = rng.randrange(0, 1500, 5)
+        amounts['rest_allowance'] = rng.choice((0, 0, 200))
+        amounts['special_incentive'] = rng.choice((0, 0, 0, 1000))
+        amounts['meal_allowance'] = 300
+        amounts['transport_allowance'] = rng.choice((200, 400))
+        amounts['loan'] = rng.choice((0, 0, 0, 500, 1000))
+        amounts['insurance'] = round(amounts['base_salary'] * 0.11)
+        amounts['absence'] = rng.choice((0, 0, 0, 0, 150, 300))
+        amounts['penalties'] = rng.choice((0, 0, 0, 0, 100))
+        amounts['quality_deduction_cash'] = rng.choice((0, 0, 0, 50))
+        amounts['quality_deduction_days'] = rng.choice((0, 0, 0, 1, 2))
+        amounts['installments'] = rng.choice((0, 0, 250))
+        amounts['monthly_receipts'] = rng.choice((0, 0, 100))
+        amounts['total_entitlements'] = sum(amounts[f] for f in ENTITLEMENTS)
+        amounts['total_deductions'] = sum(amounts[f] for f in DEDUCTIONS)
+        amounts['net_salary'] = amounts['total_entitlements'] - amounts['total_deductions']
+
+        values = [
+            _dirty_amount(amounts[field], rng) if field in amounts else rng.choice(EVALUATIONS)
+            for field in STATEMENT_COLUMNS
+        ]
+        if invalid_rate and rng.random() < invalid_rate:
+            values[rng.randrange(len(values))] = rng.choice(('abc', '١٢x', '--'))
+
+        employee_id = str(first_id + i)
+        yield (
+            employee_id if rng.random() < 0.9 else employee_id.translate(_ARABIC_DIGITS),
+            f'{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            rng.choice(BRANCHES),
+            _dirty_bank(rng),
+            *values,
+            rng.choice(NOTES),
+        )
+
+
+def write_payroll_file(path, count, seed=0, invalid_rate=0.0, file_format='xlsx'):
+    """يكتب شيت وهمي (write_only / csv) في path ويرجّع عدد الصفوف."""
+    rows = payroll_rows(count, seed=seed, invalid_rate=invalid_rate)
+    if file_format == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8-sig') as fh:
+            writer = csv.writer(fh)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+        return count
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('المرتبات')
+    sheet.sheet_view.rightToLeft = True
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return count
@@ -1,3 +1,258 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from tempfile import NamedTemporaryFile
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import CustomUser
+from .coercion import REQUIRED_COLUMNS, STATEMENT_COLUMNS, coerce_rows, resolve_columns
+from .exports import PAYROLL_HEADER, stream_payroll_workbook
+from .importer import BackfillImporter, SalaryImporter
+from .models import ImportMode, SalaryStatement
+from .pagination import encode_cursor, keyset_page
+from .readers import open_reader
+from .serializers import SalaryStatementSerializer, StatementRowSerializer
+
+MONTH = date(2026, 9, 1)
+HEADER = REQUIRED_COLUMNS + ('اسم الفرع',)
+
+
+def payroll_row(employee_id, name='احمد علي', branch='فرع 1', **cells):
+    """صف شيت بكل الأعمدة الإجبارية؛ cells بأسماء حقول SalaryStatement (net_salary='...')."""
+    values = {column: '100' for column in STATEMENT_COLUMNS.values()}
+    values[STATEMENT_COLUMNS['performance_evaluation']] = 'جيد'
+    for field, value in cells.items():
+        values[STATEMENT_COLUMNS[field]] = value
+    values.update({'رقم تعريفى': employee_id, 'الاسم': name, 'اسم الفرع': branch})
+    return tuple(values[column] for column in HEADER)
+
+
+def run_import(rows, month=MONTH, **kwargs):
+    importer = SalaryImporter(month, use_copy=False, **kwargs)
+    stats = importer.run(HEADER, enumerate(rows, start=2))
+    return importer, stats
+
+
+def net_salaries(month=MONTH):
+    return dict(SalaryStatement.objects.filter(month=month).values_list('user__employee_id', 'net_salary'))
+
+
+class SalaryImporterTests(TestCase):
+
+    def test_replace_creates_users_and_statements(self):
+        _, stats = run_import([payroll_row('E1', net_salary='1500'), payroll_row('E2', branch='فرع 2')])
+
+        self.assertEqual(stats['processed'], 2)
+        self.assertEqual(stats['created_users'], 2)
+        self.assertEqual(net_salaries(), {'E1': Decimal('1500.00'), 'E2': Decimal('100.00')})
+        user = CustomUser.objects.get(employee_id='E2')
+        self.assertEqual((user.first_name, user.last_name, user.branch_name), ('احمد', 'علي', 'فرع 2'))
+        self.assertTrue(user.is_defult_password)
+
+    def test_replace_deletes_missing_employees_and_keeps_rejected_ones(self):
+        run_import([payroll_row(eid, net_salary='100') for eid in ('E1', 'E2', 'E3')])
+
+        importer, stats = run_import([payroll_row('E1', net_salary='200'), payroll_row('E2', net_salary='abc')])
+
+        self.assertEqual(importer.errors, [(3, 'E2', 'صافي المرتبات', 'قيمة غير صحيحة: abc')])
+        self.assertEqual(importer.kept_ids, {'E2'})
+        self.assertEqual(stats['invalid_rows'], 1)
+        # E3 مش في الملف فاتشال، وE2 صفه اترفض فمفرداته القديمة فضلت
+        self.assertEqual(net_salaries(), {'E1': Decimal('200.00'), 'E2': Decimal('100.00')})
+
+    def test_rejected_row_does_not_keep_employee_with_a_valid_row(self):
+        run_import([payroll_row('E1', net_salary='100')])
+
+        importer, _ = run_import([payroll_row('E1', net_salary=''), payroll_row('E1', net_salary='300')])
+
+        self.assertEqual(importer.errors, [(2, 'E1', 'صافي المرتبات', 'خانة فاضية')])
+        self.assertEqual(importer.kept_ids, set())
+        self.assertEqual(net_salaries(), {'E1': Decimal('300.00')})
+
+    def test_diff_updates_only_changed_rows(self):
+        run_import([payroll_row('E1'), payroll_row('E2'), payroll_row('E3')])
+        before = dict(SalaryStatement.objects.values_list('user__employee_id', 'pk'))
+
+        _, stats = run_import(
+            [payroll_row('E1', net_salary='999'), payroll_row('E2'), payroll_row('E4')], mode=ImportMode.DIFF,
+        )
+
+        self.assertEqual((stats['inserted'], stats['updated'], stats['unchanged'], stats['deleted']), (1, 1, 1, 1))
+        after = dict(SalaryStatement.objects.values_list('user__employee_id', 'pk'))
+        self.assertEqual(after['E1'], before['E1'])
+        self.assertEqual(after['E2'], before['E2'])
+        self.assertNotIn('E3', after)
+        self.assertEqual(net_salaries()['E1'], Decimal('999.00'))
+
+    def test_diff_keeps_employees_whose_rows_were_rejected(self):
+        run_import([payroll_row('E1'), payroll_row('E2')])
+
+        _, stats = run_import([payroll_row('E1'), payroll_row('E2', loan='x')], mode=ImportMode.DIFF)
+
+        self.assertEqual((stats['unchanged'], stats['deleted'], stats['invalid_rows']), (1, 0, 1))
+        self.assertEqual(set(net_salaries()), {'E1', 'E2'})
+
+    def test_dry_run_previews_without_writing(self):
+        run_import([payroll_row('E1'), payroll_row('E2'), payroll_row('E3')])
+
+        _, stats = run_import(
+            [payroll_row('E1', net_salary='500'), payroll_row('E2'), payroll_row('E3', absence='?'),
+             payroll_row('E9', branch='فرع 9')],
+            dry_run=True,
+        )
+
+        self.assertTrue(stats['dry_run'])
+        expected = {'new_employees': 1, 'inserted': 1, 'updated': 1, 'unchanged': 1, 'deleted': 0, 'invalid_rows': 1}
+        self.assertEqual({key: stats[key] for key in expected}, expected)
+        self.assertFalse(CustomUser.objects.filter(employee_id='E9').exists())
+        self.assertEqual(net_salaries(), dict.fromkeys(['E1', 'E2', 'E3'], Decimal('100.00')))
+
+    def test_older_month_does_not_overwrite_current_user_fields(self):
+        run_import([payroll_row('E1', branch='الفرع الحالي', base_salary='5000')])
+
+        run_import([payroll_row('E1', branch='فرع قديم', base_salary='3000')], month=date(2026, 5, 1))
+
+        user = CustomUser.objects.get(employee_id='E1')
+        self.assertEqual((user.branch_name, user.base_salary), ('الفرع الحالي', Decimal('5000.00')))
+
+
+class CoerceRowsTests(SimpleTestCase):
+
+    def coerce(self, *rows):
+        return coerce_rows(resolve_columns(HEADER), list(rows))
+
+    def test_arabic_indic_digits(self):
+        batch = self.coerce(payroll_row('١٢٣', net_salary='١٬٢٣٤٫٥٠', loan='۷۵'))
+
+        record, = batch.records()
+        self.assertEqual(record['employee_id'], '123')
+        self.assertEqual(record['fields']['net_salary'], Decimal('1234.50'))
+        self.assertEqual(record['fields']['loan'], Decimal('75.00'))
+
+    def test_rtl_marks_and_nbsp_are_stripped(self):
+        batch = self.coerce(payroll_row('\u200fE7\u200e', branch='\u202bفرع\u00a0المعادي\u202c', extra='\u200f250 '))
+
+        record, = batch.records()
+        self.assertEqual(record['employee_id'], 'E7')
+        self.assertEqual(record['branch'], 'فرع المعادي')
+        self.assertEqual(record['fields']['extra'], Decimal('250.00'))
+
+    def test_amounts_are_rounded_before_the_bound_check(self):
+        batch = self.coerce(
+            payroll_row('E1', net_salary='99999999.99'),
+            payroll_row('E2', net_salary='99999999.999'),
+            payroll_row('E3', net_salary='-0.001'),
+        )
+
+        self.assertEqual(batch.errors, [(1, 'صافي المرتبات', 'قيمة غير صحيحة: 99999999.999')])
+        records = {r['employee_id']: r['fields']['net_salary'] for r in batch.records()}
+        self.assertEqual(records, {'E1': Decimal('99999999.99'), 'E3': Decimal('0.00')})
+
+    def test_empty_and_over_long_cells_are_rejected(self):
+        batch = self.coerce(payroll_row(''), payroll_row('E2', special_bonus=' '), payroll_row('E' * 21))
+
+        self.assertEqual(batch.invalid.tolist(), [True, True, True])
+        self.assertEqual(sorted(column for _, column, _ in batch.errors),
+                         ['رقم تعريفى', 'رقم تعريفى', 'علاوة استثنائية'])
+
+
+class KeysetPageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for month in (date(2026, 7, 1), date(2026, 8, 1), MONTH):
+            run_import([payroll_row(f'E{i}') for i in range(3)], month=month)
+        cls.ordered = list(SalaryStatement.objects.order_by('-month', '-id'))
+
+    def test_after_cursor_walks_every_row_once(self):
+        seen, cursor = [], None
+        while True:
+            page = keyset_page(SalaryStatement.objects.all(), after=cursor, per_page=4)
+            seen += page.object_list
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, self.ordered)
+
+    def test_before_cursor_returns_the_previous_page(self):
+        first = keyset_page(SalaryStatement.objects.all(), per_page=4)
+        second = keyset_page(SalaryStatement.objects.all(), after=first.next_cursor, per_page=4)
+
+        back = keyset_page(SalaryStatement.objects.all(), before=second.previous_cursor, per_page=4)
+
+        self.assertTrue(second.has_previous)
+        self.assertEqual(back.object_list, first.object_list)
+        self.assertFalse(back.has_previous)
+        self.assertTrue(back.has_next)
+
+    def test_empty_before_page_falls_back_to_the_first_page(self):
+        # مفيش صفوف أحدث من أحدث صف: الصفحة الأولى مش صفحة فاضية
+        page = keyset_page(SalaryStatement.objects.all(), before=encode_cursor(self.ordered[0]), per_page=4)
+
+        self.assertEqual(page.object_list, self.ordered[:4])
+        self.assertFalse(page.has_previous)
+
+    def test_broken_cursor_starts_from_the_first_page(self):
+        page = keyset_page(SalaryStatement.objects.all(), after='not-a-cursor', per_page=4)
+
+        self.assertEqual(page.object_list, self.ordered[:4])
+
+
+class StatementRowSerializerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        run_import([
+            payroll_row('E1', net_salary='1234.5', quality_deduction_days='0.25'),
+            payroll_row('E2', name='محمد', performance_evaluation=''),
+        ])
+        hr = CustomUser.objects.create_user(username='hr', employee_id='hr1', password='x', role='hr')
+        SalaryStatement.objects.filter(user__employee_id='E1').update(updated_by=hr, notes='ملاحظة')
+        CustomUser.objects.filter(employee_id='E2').update(is_active=False)
+
+    def assertSameBytes(self, fields=None):
+        queryset = SalaryStatement.objects.order_by('-month', '-id')
+        renderer = JSONRenderer()
+        expected = renderer.render(SalaryStatementSerializer(queryset.select_related('user'), many=True,
+                                                             fields=fields).data)
+        fast = StatementRowSerializer(fields=fields)
+        self.assertEqual(renderer.render(fast.data(fast.rows(queryset))), expected)
+
+    def test_same_bytes_as_model_serializer(self):
+        self.assertSameBytes()
+
+    def test_same_bytes_for_sparse_fields(self):
+        self.assertSameBytes(['id', 'user_full_name', 'net_salary', 'updated_by'])
+
+
+class PayrollExportRoundTripTests(TestCase):
+
+    def test_exported_workbook_imports_back_unchanged(self):
+        run_import([
+            payroll_row('E1', name='أحمد محمد علي', net_salary='1234.56', quality_deduction_days='0.5'),
+            payroll_row('E2', name='منى', branch='فرع 2', performance_evaluation='ممتاز'),
+        ])
+        SalaryStatement.objects.filter(user__employee_id='E1').update(notes='ملاحظة')
+        CustomUser.objects.filter(employee_id='E2').update(bank_account_number='0012345')
+        queryset = SalaryStatement.objects.order_by('user__employee_id')
+
+        with NamedTemporaryFile(suffix='.xlsx') as file:
+            for chunk in stream_payroll_workbook(queryset, chunk_size=1):
+                file.write(chunk)
+            file.flush()
+            # نفس قارئ الرفع (load_workbook بوضع read_only)
+            with open_reader(file.name) as reader:
+                header, rows = reader.header, list(reader)
+
+        self.assertEqual(header, PAYROLL_HEADER)
+        self.assertEqual([line for line, _ in rows], [2, 3])
+        self.assertEqual([row[0] for _, row in rows], ['E1', 'E2'])
+        # الملف بعمود الشهر بيترفع تاني (backfill) لنفس الشهر من غير أي تغيير
+        importer = BackfillImporter(mode=ImportMode.DIFF, use_copy=False)
+        stats = importer.run(header, rows)
+
+        self.assertEqual(importer.errors, [])
+        self.assertEqual(list(stats['months']), ['2026-09'])
+        self.assertEqual((stats['unchanged'], stats['updated'], stats['inserted'], stats['deleted']), (2, 0, 0, 0))
+        self.assertEqual(stats['updated_users'], 0)
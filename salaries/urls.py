@@ -4,6 +4,12 @@ from .views import *
 urlpatterns = [
     path('', salary_list, name='salary_list'),
     path('salary-details/<int:pk>/', salary_slip_detail, name='salary_detail'),
+    path('salary-details/<int:pk>/pdf/', salary_slip_pdf, name='salary_detail_pdf'),
+    path('slips/pdf/', salary_slips_batch_pdf, name='salary_slips_batch_pdf'),
+    path('slips/pdf/<uuid:job_id>/', salary_slips_job, name='salary_slips_job'),
+    path('export/', salary_payroll_export, name='salary_payroll_export'),
+    path('summary/', payroll_summary, name='payroll_summary'),
+    path('summary/api/', BranchPayrollSummaryAPI.as_view(), name='payroll-summary-api'),
 
     # صفحة الرفع (تعرض الفورم والسجل فقط)
     path('upload/', upload_salary_excel, name='upload_excel'),
@@ -11,8 +17,11 @@ urlpatterns = [
     # Endpoints الرفع الحقيقي مع Progress
     path('upload/start/', salary_upload_start, name='salary-upload-start'),
     path('upload/progress/<str:upload_id>/', salary_upload_progress, name='salary-upload-progress'),
+    path('upload/stream/<str:upload_id>/', salary_upload_stream, name='salary-upload-stream'),
+    path('upload/errors/<uuid:upload_id>/', salary_upload_errors, name='salary-upload-errors'),
 
     path('my-slip/', MySalaryStatements.as_view(), name='my-slip'),
+    path('my-slip/history/', MySalaryHistory.as_view(), name='my-slip-history'),
     path('reset-password/<int:pk>/', reset_user_password, name='reset-user-password'),
     path('delete-all-salaries/', delete_all_salaries, name='delete-all-salaries'),
 
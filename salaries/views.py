@@ -1,5 +1,4 @@
 from django.http import HttpResponseForbidden
-import pandas as pd
 from django.shortcuts import render, redirect, get_object_or_404
 from .forms import UploadFileForm
 from .models import SalaryStatement
@@ -9,9 +8,11 @@ from django.contrib import messages
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .serializers import SalaryStatementSerializer
+from .serializers import SalaryStatementSerializer, StatementRowSerializer
 from rest_framework import status
-from django.core.paginator import Paginator
+from rest_framework.utils.urls import replace_query_param
+from .pagination import keyset_page
+from accounts.search import search_filter
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.exceptions import PermissionDenied
 from django.db.models import Q
@@ -19,252 +20,180 @@ from django.urls import reverse_lazy
 
 from .models import SalaryStatement
 from tokens.models import ExpiringToken
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from .serializers import SalaryStatementSerializer
 
 class MySalaryStatements(APIView):
+    """
+    آخر مفردات للموظف بس (LIMIT 1 على index (user, month)) مع ETag / Last-Modified،
+    فالتطبيق بياخد 304 لو مفيش جديد من آخر مرة.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        slips = SalaryStatement.objects.filter(user=request.user).order_by('-month')
-        if slips.exists():
-            serializer = SalaryStatementSerializer(slips, many=True)
-            return Response(serializer.data[0])
-        else:
+        slip = (
+            SalaryStatement.objects.filter(user=request.user)
+            .select_related('user').order_by('-month', '-id').first()
+        )
+        if slip is None:
             return Response({'message':[ 'لم يتم رفع مفردات مرتب هذا الشهر بعد']},
                             status=status.HTTP_400_BAD_REQUEST)
 
-# -- أدوات مساعدة: تنسيق رقم الحساب + تحويل رقم عشري --
-from decimal import Decimal, InvalidOperation
-def normalize_bank_account(value):
-    if value is None:
-        return ''
-    s = str(value).strip()
-    for ch in [' ', '\u00A0', '\u200f', '\u200e', '\u202a', '\u202b', '\u202c']:
-        s = s.replace(ch, '')
-    s = s.translate(str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789'))
-    return s
-
-def to_decimal(v):
-    if v is None:
-        return None
-    try:
-        s = str(v).strip().replace(',', '')
-        if s == '':
-            return None
-        d = Decimal(s)
-        if d < 0:
-            return None
-        return d
-    except (InvalidOperation, ValueError):
-        return None
-
-from .models import ExcelUploadLog
-
-# =============== رفع بــ Progress حقيقي ===============
-import os, uuid, threading, tempfile
-from django.core.cache import cache
-from django.http import JsonResponse, HttpResponseBadRequest
-from django.db import transaction
-
-_PROGRESS_TTL = 60 * 60  # ثانية (ساعة)
-
-def _progress_key(upload_id: str) -> str:
-    return f"salary_upload:{upload_id}"
-
-def _set_progress(upload_id: str, **data):
-    key = _progress_key(upload_id)
-    state = cache.get(key) or {}
-    state.update(data)
-    cache.set(key, state, _PROGRESS_TTL)
-    return state
-
-def _process_excel_background(upload_id: str, file_path: str, uploader_id: int, file_name: str):
+        # بيانات الموظف اللي في الرد جزء من الـ ETag كمان
+        user = slip.user
+        version = f'{slip.pk}:{slip.updated_at.isoformat()}:{user.get_full_name()}:{user.username}:{user.is_active}'
+        etag = quote_etag(hashlib.blake2b(version.encode(), digest_size=12).hexdigest())
+        last_modified = int(slip.updated_at.timestamp())
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        response = not_modified or Response(SalaryStatementSerializer(slip).data)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+class MySalaryHistory(APIView):
     """
-    معالجة الإكسل في الخلفية + تحديث نسبة التقدم في الكاش.
+    تاريخ مفردات الموظف بـ cursor على (month, id) من الأحدث للأقدم.
+    ?fields=month,net_salary بيقلل أعمدة الاستعلام والرد، ?limit= عدد الشهور في الصفحة.
     """
-    try:
-        _set_progress(upload_id, status='running', processed=0, total=0, percent=0)
-
-        # نقرأ الإكسل بنفس إعداداتك (خليها XLSX)
-        df = pd.read_excel(file_path, dtype=str, na_filter=False, keep_default_na=False, engine='openpyxl')
-        df = df.fillna('')
-
-        total = len(df.index)
-        _set_progress(upload_id, total=total)
-
-        # الشهر الحالي (أول يوم في الشهر)
-        current_month = datetime.now().date().replace(day=1)
-
-        # امسح مفردات الشهر الحالي فقط (زي ما كنت عامل)
-        SalaryStatement.objects.filter(month=current_month).delete()
-
-        processed = 0
-
-        # عالج صفوف الملف
-        for _, row in df.iterrows():
-            # أساسيّات
-            employee_id = str(row['رقم تعريفى'])
-            name = row['الاسم']
-
-            # حقول ثابتة تُخزّن على المستخدم وتُحدّث كل رفع
-            branch = str(row.get('اسم الفرع') or row.get('الفرع') or '').strip()
-            bank_raw = row.get('رقم الحساب البنكي') or row.get('رقم الحساب') or ''
-            bank = normalize_bank_account(bank_raw)
-
-            base_raw = (
-                row.get('المرتب الاساسي') or
-                row.get('الراتب الأساسي') or
-                row.get('الراتب الاساسي') or
-                row.get('الراتب الاساسى') or
-                row.get('basic_salary') or
-                row.get('base_salary') or
-                row.get('base salary')
-            )
-            base_salary_dec = to_decimal(base_raw)
-
-            # باقي أعمدة المفردات (على مستوى الشهر)
-            base_salary = row['المرتب الاساسي']
-            changed_salary = row['المرتب المتغير']
-            special_bonus = row['علاوة استثنائية']
-            extra = row['الاضافى']
-            rest_allowance = row['بدل الراحة']
-            performance_evaluation = row['تقييم أداء']
-            special_incentive = row['حافز استثنائى']
-            meal_allowance = row['بدل وجبة']
-            transport_allowance = row['بدل انتقال']
-            total_entitlements = row['اجمالي الاستحقاقات']
-
-            loan = row['السلف']
-            insurance = row['تأمينات']
-            absence = row['الغياب']
-            penalties = row['الجزاءات']
-            quality_deduction_cash = row['خصم الجودة نقدى']
-            quality_deduction_days = row['خصم الجودة أيام']
-            installments = row['الأقساط']
-            monthly_receipts = row['الايصالات الشهرية']
-            total_deductions = row['اجمالي الاستقطاعات']
-            net_salary = row['صافي المرتبات']
-            notes = row.get('ملاحظات', '')
-
-            # احضر/أنشئ المستخدم
-            user, created = CustomUser.objects.get_or_create(
-                employee_id=employee_id,
-                defaults={
-                    'username': employee_id,
-                    'first_name': name.split()[0] if name else '',
-                    'last_name': ' '.join(name.split()[1:]) if name else '',
-                    'role': 'user',
-                }
-            )
-
-            # حدّث الحقول الثابتة لو موجودة
-            changed_user = False
-            if branch and user.branch_name != branch:
-                user.branch_name = branch
-                changed_user = True
-            if bank and user.bank_account_number != bank:
-                user.bank_account_number = bank
-                changed_user = True
-            if (base_salary_dec is not None) and (user.base_salary != base_salary_dec):
-                user.base_salary = base_salary_dec
-                changed_user = True
-            if changed_user:
-                user.save()
-
-            if created:
-                user.set_password('0000')
-                user.is_defult_password = True
-                user.save()
-
-            # أنشئ مفردات الشهر
-            SalaryStatement.objects.create(
-                user=user,
-                month=current_month,
-                base_salary=base_salary,
-                changed_salary=changed_salary,
-                special_bonus=special_bonus,
-                extra=extra,
-                rest_allowance=rest_allowance,
-                performance_evaluation=performance_evaluation,
-                special_incentive=special_incentive,
-                meal_allowance=meal_allowance,
-                transport_allowance=transport_allowance,
-                total_entitlements=total_entitlements,
-                loan=loan,
-                insurance=insurance,
-                absence=absence,
-                penalties=penalties,
-                quality_deduction_cash=quality_deduction_cash,
-                quality_deduction_days=quality_deduction_days,
-                installments=installments,
-                monthly_receipts=monthly_receipts,
-                total_deductions=total_deductions,
-                net_salary=net_salary,
-                notes=notes,
-            )
-
-            processed += 1
-            if total and (processed % 10 == 0 or processed == total):
-                _set_progress(upload_id, processed=processed, percent=int(processed * 100 / total))
+    permission_classes = [IsAuthenticated]
+    default_limit = 12
+    max_limit = 60
 
-        # سجل رفع واحد (بدل ما يبقى لكل صف)
-        ExcelUploadLog.objects.create(
-            uploader_id=uploader_id,
-            file_name=file_name,
-            sheet_name='Sheet1',
-            month=current_month,
-        )
+    def get(self, request):
+        available = list(SalaryStatementSerializer().fields)
+        fields = None
+        if request.query_params.get('fields'):
+            fields = [f.strip() for f in request.query_params['fields'].split(',') if f.strip()]
+            unknown = [f for f in fields if f not in available]
+            if unknown:
+                return Response({'message': [f'حقول غير معروفة: {", ".join(unknown)}']},
+                                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        limit = max(limit, 1)
+
+        # values_list + محوّلات جاهزة: نفس JSON بتاع SalaryStatementSerializer بأعمدة الحقول المطلوبة بس
+        serializer = StatementRowSerializer(fields=fields)
+        rows = serializer.rows(SalaryStatement.objects.filter(user=request.user))
+        page = keyset_page(rows, after=request.query_params.get('cursor'), per_page=limit,
+                           key=serializer.key)
+
+        next_url = None
+        if page.has_next:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', page.next_cursor)
+        return Response({
+            'next': next_url,
+            'results': serializer.data(page.object_list),
+        })
 
-        _set_progress(upload_id, processed=processed, percent=100, status='done')
+from .models import ExcelUploadLog
 
-    except KeyError as e:
-        _set_progress(upload_id, status='error', error=f'عمود مفقود في الملف: {e}')
-    except Exception as e:
-        _set_progress(upload_id, status='error', error=str(e))
-    finally:
-        try:
-            os.remove(file_path)
-        except Exception:
-            pass
+# =============== رفع بــ Progress حقيقي ===============
+import json, time
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from .jobs import enqueue_job, enqueue_slips_job, get_progress
+import os
+from django.http import FileResponse, Http404
+import tempfile
+from .slips import SLIP_SYNC_LIMIT, batch_pdf, month_slips, slip_pdf, slips_filename
+from django.utils.http import content_disposition_header
+from .exports import stream_payroll_workbook
+from .models import BranchPayrollSummary, ImportJobStatus, ImportMode, JobKind, SalaryImportJob
+from .summaries import SUMMARY_FIELDS, latest_summary_month, month_summary
 
 @login_required
 @user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
 def salary_upload_start(request):
-    """يبدأ رفع الملف ويطلق المعالجة في خلفية (Thread) مع Progress في الكاش."""
+    """يحفظ الملف ويضيف مهمة في الطابور؛ المعالجة نفسها في salary_import_worker."""
     if request.user.role not in ['admin', 'hr']:
         return HttpResponseForbidden("🚫 You don't have permission to access this page.")
     if request.method != 'POST':
         return HttpResponseBadRequest('Invalid method')
 
-    f = request.FILES.get('file')
-    if not f:
-        return JsonResponse({'ok': False, 'msg': 'لم يتم اختيار ملف'})
-
-    fd, tmp_path = tempfile.mkstemp(prefix='salary_', suffix='.xlsx')
-    with os.fdopen(fd, 'wb') as out:
-        for chunk in f.chunks():
-            out.write(chunk)
-
-    upload_id = str(uuid.uuid4())
-    _set_progress(upload_id, status='queued', percent=0, processed=0, total=0)
-
-    threading.Thread(
-        target=_process_excel_background,
-        args=(upload_id, tmp_path, request.user.id, f.name),
-        daemon=True
-    ).start()
-
-    return JsonResponse({'ok': True, 'upload_id': upload_id})
+    form = UploadFileForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return JsonResponse({'ok': False, 'msg': next(iter(form.errors.values()))[0]})
+
+    job, duplicate = enqueue_job(
+        form.cleaned_data['file'], request.user,
+        mode=form.cleaned_data['mode'] or ImportMode.REPLACE,
+        force=form.cleaned_data['force'],
+        file_format=form.file_format,
+        month=form.cleaned_data['month'],
+        backfill=form.cleaned_data['backfill'],
+        dry_run=form.cleaned_data['dry_run'],
+    )
+    if duplicate:
+        return JsonResponse({
+            'ok': False, 'duplicate': True,
+            'msg': 'نفس الملف اترفع قبل كده لنفس الشهر. علّم على "إعادة الاستيراد" لو عايز ترفعه تاني.',
+        })
+    return JsonResponse({'ok': True, 'upload_id': str(job.id)})
 
 @login_required
 @user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
 def salary_upload_progress(request, upload_id: str):
     """Polling لحالة ونسبة التقدّم."""
-    state = cache.get(_progress_key(upload_id)) or {}
+    state = get_progress(upload_id)
     if not state:
         return JsonResponse({'ok': False, 'status': 'unknown'})
     state['ok'] = True
     return JsonResponse(state)
+
+_STREAM_INTERVAL = 0.5       # ثانية بين كل قراءة لصف المهمة
+_STREAM_KEEPALIVE = 15       # ثانية: تعليق فاضي عشان الـ proxy ما يقفلش الاتصال
+# كل stream بيحجز thread في الـ web (Procfile: gunicorn gthread)؛ الاتصال بيتقفل قبل timeout
+# الـ worker (30 ثانية) والمتصفح بيعيد الاتصال لوحده بعد _STREAM_RETRY_MS
+_STREAM_MAX_SECONDS = 25
+_STREAM_RETRY_MS = 1000
+
+@login_required
+@user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
+def salary_upload_stream(request, upload_id: str):
+    """Server-Sent Events: يبعت حالة الرفع لما تتغير بدل ما المتصفح يعمل polling."""
+    if request.user.role not in ['admin', 'hr']:
+        return HttpResponseForbidden("🚫 You don't have permission to access this page.")
+
+    def events():
+        last = None
+        last_sent = started = time.monotonic()
+        yield f"retry: {_STREAM_RETRY_MS}\n\n"
+        while time.monotonic() - started < _STREAM_MAX_SECONDS:
+            state = get_progress(upload_id)
+            state = dict(state, ok=True) if state else {'ok': False, 'status': 'unknown'}
+            if state != last:
+                last = state
+                last_sent = time.monotonic()
+                yield f"data: {json.dumps(state, cls=DjangoJSONEncoder)}\n\n"
+                if state['status'] in ('done', 'error', 'unknown'):
+                    return
+            elif time.monotonic() - last_sent >= _STREAM_KEEPALIVE:
+                last_sent = time.monotonic()
+                yield ": keepalive\n\n"
+            time.sleep(_STREAM_INTERVAL)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@login_required
+@user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
+def salary_upload_errors(request, upload_id):
+    """تحميل تقرير الصفوف المرفوضة (xlsx) لمهمة رفع."""
+    if request.user.role not in ['admin', 'hr']:
+        return HttpResponseForbidden("🚫 You don't have permission to access this page.")
+    job = get_object_or_404(SalaryImportJob, pk=upload_id)
+    if not job.error_report:
+        raise Http404
+    return FileResponse(job.error_report.open('rb'), as_attachment=True,
+                        filename=os.path.basename(job.error_report.name))
 # =============== نهاية الرفع بــ Progress ===============
 
 @login_required
@@ -285,6 +214,7 @@ def upload_salary_excel(request):
 @user_passes_test(lambda user: user.role in ['admin', 'hr'])
 def delete_all_salaries(request):
     SalaryStatement.objects.all().delete()
+    BranchPayrollSummary.objects.all().delete()
     messages.success(request, "✅ تم حذف جميع بيانات المرتبات بنجاح.")
     return redirect('upload_excel')
 
@@ -300,20 +230,18 @@ def salary_list(request):
     search_query = request.GET.get('search', '')
     if search_query:
         if request.user.role in ['admin', 'hr']:
-            salary_statements = salary_statements.filter(
-                Q(user__first_name__icontains=search_query) |
-                Q(user__last_name__icontains=search_query) |
-                Q(user__employee_id__icontains=search_query)
-            )
+            # بحث موحّد عربي على search_text (trigram index على PostgreSQL)
+            salary_statements = salary_statements.filter(search_filter(search_query, prefix='user__'))
         else:
             salary_statements = salary_statements.filter(
                 Q(user__employee_id__icontains=search_query)
             )
 
-    salary_statements = salary_statements.order_by('-month')
-    paginator = Paginator(salary_statements, 15)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # keyset على (month, id) بدل OFFSET + COUNT(*): أي صفحة بنفس التكلفة
+    page_obj = keyset_page(
+        salary_statements, after=request.GET.get('after'), before=request.GET.get('before'),
+        per_page=15, estimate=request.user.role in ['admin', 'hr'],
+    )
 
     return render(request, 'salaries/salary_list.html', {'page_obj': page_obj})
 
@@ -335,6 +263,131 @@ def salary_slip_detail(request, pk):
 
     return render(request, 'salaries/salary_slip_detail.html', {'slip': slip})
 
+@login_required
+@user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
+def salary_slip_pdf(request, pk):
+    """كشف واحد PDF (من الكاش لو الكشف ماتعدّلش)."""
+    slip = get_object_or_404(SalaryStatement.objects.select_related('user'), id=pk)
+    if not request.user.role in ['admin', 'hr'] and slip.user != request.user:
+        raise PermissionDenied
+    filename = f'slip-{slip.user.employee_id or slip.user.username}-{slip.month:%Y-%m}.pdf'
+    return FileResponse(open(slip_pdf(slip), 'rb'), as_attachment=True, filename=filename,
+                        content_type='application/pdf')
+
+def _month_statements(request):
+    """(month, branch, مفردات الشهر/الفرع مترتبة) من ?month=YYYY-MM&branch=؛ month = None لو غلط."""
+    try:
+        month = datetime.strptime(request.GET.get('month', ''), '%Y-%m').date()
+    except ValueError:
+        return None, '', SalaryStatement.objects.none()
+    branch = request.GET.get('branch', '').strip()
+    return month, branch, month_slips(month, branch)
+
+@login_required
+@user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
+def salary_slips_batch_pdf(request):
+    """
+    كل كشوف شهر (?month=YYYY-MM) لفرع (?branch=، اختياري) في PDF واحد، صفحة لكل موظف.
+    الدفعة الصغيرة بتتحوّل في الطلب نفسه؛ الكبيرة بتروح لطابور المهام (تعدّي timeout الـ worker).
+    """
+    if request.user.role not in ['admin', 'hr']:
+        return HttpResponseForbidden("🚫 You don't have permission to access this page.")
+    month, branch, slips = _month_statements(request)
+    if month is None:
+        return HttpResponseBadRequest('month لازم يكون YYYY-MM')
+    count = slips.count()
+    if not count:
+        raise Http404
+    if count > SLIP_SYNC_LIMIT:
+        job = enqueue_slips_job(month, branch, request.user)
+        return redirect('salary_slips_job', job_id=job.pk)
+
+    output = tempfile.TemporaryFile()
+    batch_pdf(slips, output, workers=1)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=slips_filename(month, branch),
+                        content_type='application/pdf')
+
+@login_required
+@user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
+def salary_slips_job(request, job_id):
+    """حالة مهمة الكشوف (الصفحة بتعمل refresh لحد ما تخلص)، و?download=1 للملف الجاهز."""
+    if request.user.role not in ['admin', 'hr']:
+        return HttpResponseForbidden("🚫 You don't have permission to access this page.")
+    job = get_object_or_404(SalaryImportJob, pk=job_id, kind=JobKind.SLIPS)
+    if request.GET.get('download'):
+        if job.status != ImportJobStatus.DONE or not job.output:
+            raise Http404
+        return FileResponse(job.output.open('rb'), as_attachment=True, filename=job.file_name,
+                            content_type='application/pdf')
+    return render(request, 'salaries/salary_slips_job.html', {
+        'job': job, 'pending': job.status in [ImportJobStatus.QUEUED, ImportJobStatus.RUNNING],
+    })
+
+def _summary_month(request):
+    """?month=YYYY-MM أو آخر شهر فيه إجماليات؛ ValueError لو الصيغة غلط."""
+    if request.GET.get('month'):
+        return datetime.strptime(request.GET['month'], '%Y-%m').date()
+    return latest_summary_month()
+
+@login_required
+@user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
+def payroll_summary(request):
+    """داشبورد إجماليات الفروع لشهر (من جدول BranchPayrollSummary، مش من المفردات)."""
+    if request.user.role not in ['admin', 'hr']:
+        return HttpResponseForbidden("🚫 You don't have permission to access this page.")
+    try:
+        month = _summary_month(request)
+    except ValueError:
+        return HttpResponseBadRequest('month لازم يكون YYYY-MM')
+    branches, totals = month_summary(month) if month else ([], {})
+    return render(request, 'salaries/payroll_summary.html', {
+        'month': month, 'branches': branches, 'totals': totals,
+    })
+
+class BranchPayrollSummaryAPI(APIView):
+    """نفس الداشبورد كـ JSON: ?month=YYYY-MM (الافتراضي آخر شهر)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role not in ['admin', 'hr']:
+            raise PermissionDenied
+        try:
+            month = _summary_month(request)
+        except ValueError:
+            return Response({'message': ['month لازم يكون YYYY-MM']}, status=status.HTTP_400_BAD_REQUEST)
+        if month is None:
+            return Response({'month': None, 'branches': [], 'totals': None})
+        branches, totals = month_summary(month)
+        return Response({
+            'month': month.strftime('%Y-%m'),
+            'branches': [
+                {'branch_name': b.branch_name, 'employees': b.employees,
+                 **{field: f'{getattr(b, field):.2f}' for field in SUMMARY_FIELDS}}
+                for b in branches
+            ],
+            'totals': {'employees': totals['employees'],
+                       **{field: f'{totals[field]:.2f}' for field in SUMMARY_FIELDS}},
+        })
+
+@login_required
+@user_passes_test(lambda u: not u.is_defult_password, login_url=reverse_lazy('reset-password'))
+def salary_payroll_export(request):
+    """مفردات شهر (?month=YYYY-MM) لفرع (?branch=، اختياري) كـ xlsx بيتبعت وهو بيتكتب."""
+    if request.user.role not in ['admin', 'hr']:
+        return HttpResponseForbidden("🚫 You don't have permission to access this page.")
+    month, branch, statements = _month_statements(request)
+    if month is None:
+        return HttpResponseBadRequest('month لازم يكون YYYY-MM')
+
+    response = StreamingHttpResponse(
+        stream_payroll_workbook(statements),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+    filename = f'payroll-{month:%Y-%m}{"-" + branch if branch else ""}.xlsx'
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
+
 from django.contrib.auth import get_user_model
 from django.contrib import messages
 User = get_user_model()